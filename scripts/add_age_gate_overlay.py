@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from pathlib import Path
+from html_rewrite import Insert, Rewriter
 
 HTML_FILES = [
     "index.html",
@@ -61,29 +61,30 @@ SCRIPT = """
 """
 
 
-def inject(content: str) -> str:
-    if "age-gate-overlay" in content:
-        return content
+def not_injected(html, page):
+    return "age-gate-overlay" not in html
+
 
-    if "</head>" in content:
-        content = content.replace("</head>", STYLE + "\n</head>")
-    else:
-        content = STYLE + content
+RULES = Rewriter([
+    Insert("</head>", STYLE + "\n", when=not_injected, fallback=lambda html: STYLE + html),
+    Insert(
+        "</body>",
+        OVERLAY + "\n" + SCRIPT + "\n",
+        when=not_injected,
+        fallback=lambda html: html + OVERLAY + "\n" + SCRIPT,
+    ),
+])
 
-    if "</body>" in content:
-        content = content.replace("</body>", OVERLAY + "\n" + SCRIPT + "\n</body>")
-    else:
-        content = content + OVERLAY + "\n" + SCRIPT
 
-    return content
+def inject(content: str) -> str:
+    return RULES.apply(content)
 
 
 def main():
-    for path in HTML_FILES:
-        p = Path(path)
-        text = p.read_text(encoding="utf-8")
-        text = inject(text)
-        p.write_text(text, encoding="utf-8")
+    # Imported here: rewrite_pages imports every step module, this one included.
+    from rewrite_pages import main as rewrite_main
+
+    rewrite_main(default_steps=("age_gate",))
 
 
 if __name__ == "__main__":
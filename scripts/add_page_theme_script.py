@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from pathlib import Path
+from html_rewrite import Insert, Rewriter
 
 HTML_FILES = [
     "index.html",
@@ -35,20 +35,25 @@ SCRIPT = """
 """
 
 
+RULES = Rewriter([
+    Insert(
+        "</body>",
+        SCRIPT + "\n",
+        when=lambda html, page: "page-theme-script" not in html,
+        fallback=lambda html: html + SCRIPT,
+    ),
+])
+
+
 def inject(content: str) -> str:
-    if "page-theme-script" in content:
-        return content
-    if "</body>" in content:
-        return content.replace("</body>", SCRIPT + "\n</body>")
-    return content + SCRIPT
+    return RULES.apply(content)
 
 
 def main():
-    for path in HTML_FILES:
-        p = Path(path)
-        text = p.read_text(encoding="utf-8")
-        text = inject(text)
-        p.write_text(text, encoding="utf-8")
+    # Imported here: rewrite_pages imports every step module, this one included.
+    from rewrite_pages import main as rewrite_main
+
+    rewrite_main(default_steps=("page_theme",))
 
 
 if __name__ == "__main__":
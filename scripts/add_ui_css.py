@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from pathlib import Path
+from html_rewrite import Insert, Rewriter
 
 HTML_FILES = [
     "index.html",
@@ -19,21 +19,27 @@ FONT_LINK = "<link rel=\"stylesheet\" href=\"https://cdn.jsdelivr.net/gh/orionca
 UI_LINK = "<link rel=\"stylesheet\" href=\"/ui.css\">"
 
 
+INSERTION = "\n" + FONT_LINK + "\n" + UI_LINK + "\n"
+
+RULES = Rewriter([
+    Insert(
+        "</head>",
+        INSERTION,
+        when=lambda html, page: UI_LINK not in html,
+        fallback=lambda html: html + INSERTION,
+    ),
+])
+
+
 def inject(content: str) -> str:
-    if UI_LINK in content:
-        return content
-    insertion = "\n" + FONT_LINK + "\n" + UI_LINK + "\n"
-    if "</head>" in content:
-        return content.replace("</head>", insertion + "</head>")
-    return content + insertion
+    return RULES.apply(content)
 
 
 def main():
-    for path in HTML_FILES:
-        p = Path(path)
-        text = p.read_text(encoding="utf-8")
-        text = inject(text)
-        p.write_text(text, encoding="utf-8")
+    # Imported here: rewrite_pages imports every step module, this one included.
+    from rewrite_pages import main as rewrite_main
+
+    rewrite_main(default_steps=("ui_css",))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import argparse
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+sys.path.insert(0, str(VENDOR_DIR))
+
+from PIL import Image  # noqa: E402
+
+
+def old_array_data(im):
+    # What __array_interface__ built before it could share the image memory
+    return im.tobytes("raw", "L") if im.mode == "1" else im.tobytes()
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def histogram_pickled(im):
+    return sum(im.histogram())
+
+
+def histogram_shared(name, mode, size):
+    shm = SharedMemory(name)
+    # Attaching registers the block too (before Python 3.13); the parent owns it.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    im = Image.frombuffer(mode, size, shm.buf, "raw", mode, 0, 1)
+    total = sum(im.histogram())
+    del im
+    shm.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark copying vs sharing image memory")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    size = (args.width, args.height)
+    noise = Image.effect_noise(size, 64)
+    images = {
+        "1": noise.convert("1"),
+        "L": noise,
+        "RGB": Image.merge("RGB", (noise,) * 3),
+        "RGBA": Image.merge("RGBA", (noise,) * 4),
+    }
+    print(f"{size[0]}x{size[1]}, best of {args.repeat}")
+    for mode, im in images.items():
+        copy = best_of(lambda: old_array_data(im), args.repeat)
+        shared = best_of(lambda: im.__array_interface__, args.repeat)
+        print(f"  {mode:4} array interface   copy {copy * 1000:7.2f} ms  shared {shared * 1000:7.2f} ms")
+
+    im = images["RGBA"]
+    for label, fn in (
+        ("pickle protocol 4        ", lambda: pickle.dumps(im, 4)),
+        ("pickle protocol 5        ", lambda: pickle.dumps(im, 5)),
+        ("pickle 5, out-of-band    ", lambda: pickle.dumps(im, 5, buffer_callback=lambda b: None)),
+    ):
+        print(f"  RGBA {label} {best_of(fn, args.repeat) * 1000:7.2f} ms")
+
+    # Hand the image to a worker: pickled through the pool, or written once
+    # into shared memory and wrapped there without a copy.
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(sum, ()).result()
+        pickled = best_of(lambda: pool.submit(histogram_pickled, im).result(), args.repeat)
+        buffer = im.tobuffer()
+        shm = SharedMemory(create=True, size=len(buffer))
+        try:
+            shm.buf[: len(buffer)] = buffer
+
+            def shared():
+                return pool.submit(histogram_shared, shm.name, im.mode, im.size).result()
+
+            assert shared() == pool.submit(histogram_pickled, im).result()
+            shared_time = best_of(shared, args.repeat)
+        finally:
+            del buffer
+            shm.close()
+            shm.unlink()
+    print(f"  RGBA to a pool worker    pickled {pickled * 1000:7.2f} ms  shared memory {shared_time * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+sys.path.insert(0, str(VENDOR_DIR))
+
+from PIL import Image, ImageOps, TiffImagePlugin  # noqa: E402
+
+
+def phone_exif(orientation):
+    # IFD0, Exif and GPS IFDs and a MakerNote, roughly what a phone camera writes.
+    exif = Image.Exif()
+    exif[0x010F], exif[0x0110], exif[0x0112] = "Apple", "iPhone 15 Pro", orientation
+    exif[0x011A] = exif[0x011B] = TiffImagePlugin.IFDRational(72, 1)
+    exif[0x0131], exif[0x0132] = "17.4.1", "2024:05:01 12:00:00"
+    exif[0x8769] = {
+        0x829A: TiffImagePlugin.IFDRational(1, 120),
+        0x829D: TiffImagePlugin.IFDRational(178, 100),
+        0x8827: 80,
+        0x9003: "2024:05:01 12:00:00",
+        0x920A: TiffImagePlugin.IFDRational(678, 100),
+        0x927C: os.urandom(3000),
+        0xA002: 4032,
+        0xA003: 3024,
+        0xA434: "iPhone 15 Pro back triple camera 6.86mm f/1.78",
+    }
+    exif[0x8825] = {1: "N", 2: (TiffImagePlugin.IFDRational(37, 1),) * 3, 3: "E", 4: (TiffImagePlugin.IFDRational(126, 1),) * 3}
+    return exif
+
+
+def best(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EXIF parsing and orientation handling for phone photos")
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--thumb", type=int, default=320)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    im = Image.merge("RGB", (Image.radial_gradient("L"), Image.linear_gradient("L"), Image.effect_noise((256, 256), 30)))
+    buf = io.BytesIO()
+    im.resize((args.width, args.height)).save(buf, "JPEG", quality=85, exif=phone_exif(6))
+    data = buf.getvalue()
+    box = (args.thumb, args.thumb)
+
+    def opened():
+        return Image.open(io.BytesIO(data))
+
+    def transpose_then_thumbnail():
+        out = ImageOps.exif_transpose(opened())
+        out.thumbnail(box)
+
+    def exif_thumbnail():
+        ImageOps.exif_thumbnail(opened(), box)
+
+    def rewrite(edit):
+        def run():
+            with opened() as im:
+                im.load()
+                if edit:
+                    im.getexif()[0x0131] = "edited"
+                ImageOps.exif_transpose(im, in_place=True)
+        return run
+
+    exif_bytes = opened().info["exif"]
+
+    def parse_all():
+        exif = Image.Exif()
+        exif.load(exif_bytes)
+        exif.get_ifd(0x8769)
+        exif.get_ifd(0x8825)
+
+    print(f"{args.width}x{args.height} JPEG, orientation 6, {len(exif_bytes)} bytes of EXIF, best of {args.repeat}")
+    rows = [
+        ("parse IFD0 (Orientation)", lambda: Image.Exif().load(exif_bytes), 1000),
+        ("parse IFD0 + Exif + GPS", parse_all, 100),
+        ("exif_transpose, untouched EXIF", rewrite(False), 1),
+        ("exif_transpose, edited EXIF", rewrite(True), 1),
+        (f"exif_transpose + thumbnail {args.thumb}", transpose_then_thumbnail, 1),
+        (f"exif_thumbnail {args.thumb}", exif_thumbnail, 1),
+    ]
+    for label, fn, inner in rows:
+        elapsed = best(args.repeat, lambda: [fn() for _ in range(inner)]) / inner
+        print(f"  {label:34} {elapsed * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+import time
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+sys.path.insert(0, str(VENDOR_DIR))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+
+def sample_images(size):
+    w, h = size
+    # A framed canvas with a few shapes to fill around, and a soft gradient
+    # that only a threshold fill can cross.
+    shapes = Image.new("RGB", size, (250, 250, 250))
+    draw = ImageDraw.Draw(shapes)
+    draw.rectangle([0, 0, w - 1, h - 1], outline=(0, 0, 0), width=4)
+    for i in range(12):
+        x, y = (i * 157) % (w - 200), (i * 89) % (h - 200)
+        draw.ellipse([x, y, x + 180, y + 120], fill=(30 * (i % 8), 90, 160))
+        draw.line([x, y + 150, x + 400, y + 60], fill=(0, 0, 0), width=3)
+    gradient = Image.merge(
+        "RGB",
+        (
+            Image.linear_gradient("L").resize(size),
+            Image.new("L", size, 120),
+            Image.radial_gradient("L").resize(size),
+        ),
+    )
+    return {
+        "RGB shapes, exact": (shapes, (w // 2, h - 10), (255, 0, 0), None, 0),
+        "RGB shapes, border": (shapes, (w // 2, h - 10), (255, 0, 0), (0, 0, 0), 0),
+        "L shapes, exact": (shapes.convert("L"), (w // 2, h - 10), 0, None, 0),
+        "RGB gradient, thresh 40": (gradient, (w // 2, h // 2), (255, 0, 0), None, 40),
+    }
+
+
+def legacy_floodfill(image, xy, value, border, thresh):
+    """The per-pixel set-based fill the span fill replaced."""
+    pixel = image.load()
+    background = pixel[xy]
+    if ImageDraw._color_diff(value, background) <= thresh:
+        return
+    pixel[xy] = value
+    ImageDraw._floodfill_pixels(pixel, xy, value, background, border, thresh)
+
+
+def bench(label, case, repeat):
+    image, xy, value, border, thresh = case
+    results = {}
+    for name, fn in (("per-pixel", legacy_floodfill), ("scanline ", ImageDraw.floodfill)):
+        best = float("inf")
+        for _ in range(repeat):
+            work = image.copy()
+            start = time.perf_counter()
+            fn(work, xy, value, border, thresh)
+            best = min(best, time.perf_counter() - start)
+        results[name] = (best, work.tobytes())
+    filled = ImageDraw.floodfill(image, xy, value, border, thresh, mask_only=True)
+    count = filled.histogram()[255]
+    same = len({out for _, out in results.values()}) == 1
+    print(f"{label}: {count} pixels filled, outputs {'identical' if same else 'DIFFER'}")
+    for name, (best, _) in results.items():
+        print(f"  {name}  best {best * 1000:9.1f} ms  {count / best / 1e6:7.2f} Mpx/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ImageDraw.floodfill: per-pixel vs scanline")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, case in sample_images((args.width, args.height)).items():
+        bench(label, case, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
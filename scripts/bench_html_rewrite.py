@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import naver_cleanup
+from html_rewrite import atomic_write
+from rewrite_pages import STEPS
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TREES = [ROOT / "_legacy", ROOT / "dist"]
+BENCH_STEPS = ("naver_cleanup", "unify_design", "ui_css", "age_gate", "page_theme")
+SAMPLE_META = {"name": "샘플나이트", "area": "서울 샘플구"}
+
+
+def collect(tree):
+    return sorted(p for p in tree.rglob("*.html") if "vendor" not in p.parts)
+
+
+def page_context(name, path, html):
+    # Every page gets every step, so the whole tree exercises the rules.
+    if name == "naver_cleanup":
+        meta = naver_cleanup.PAGES.get(path.as_posix(), SAMPLE_META)
+        return naver_cleanup.page_context(path, meta, html)
+    return True
+
+
+def run_per_script(files):
+    """The old flow: each script reads, rewrites rule by rule and writes."""
+    for name in BENCH_STEPS:
+        rules = STEPS[name][1]
+        for p in files:
+            html = p.read_text(encoding="utf-8")
+            html = rules.apply_each(html, page_context(name, p, html))
+            p.write_text(html, encoding="utf-8")
+
+
+def run_single_pass(files):
+    rewriter = None
+    for name in BENCH_STEPS:
+        scoped = STEPS[name][1].scoped(name)
+        rewriter = scoped if rewriter is None else rewriter + scoped
+    for p in files:
+        html = p.read_text(encoding="utf-8")
+        page = {name: page_context(name, p, html) for name in BENCH_STEPS}
+        atomic_write(p, rewriter.apply(html, page))
+
+
+def bench(tree, repeat):
+    results = {}
+    outputs = {}
+    count = 0
+    for label, fn in (("per-script re.sub", run_per_script), ("single pass      ", run_single_pass)):
+        best = float("inf")
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                work = Path(tmp) / tree.name
+                shutil.copytree(tree, work, ignore=shutil.ignore_patterns("vendor", "_next", "*.js", "*.png", "*.jpg"))
+                files = collect(work)
+                start = time.perf_counter()
+                fn(files)
+                best = min(best, time.perf_counter() - start)
+                outputs[label] = [p.read_text(encoding="utf-8") for p in files]
+        results[label] = best
+        count = len(files)
+    same = len(set(map(tuple, outputs.values()))) == 1
+    print(f"{tree} ({count} pages, outputs {'identical' if same else 'DIFFER'})")
+    for label, best in results.items():
+        print(f"  {label}  best {best * 1000:8.1f} ms  {count / best:8.0f} pages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the page mutation scripts: per-script passes vs one pass")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("trees", nargs="*", default=DEFAULT_TREES)
+    args = parser.parse_args()
+
+    for tree in map(Path, args.trees):
+        if not tree.is_dir():
+            print(f"[skip] {tree} not found")
+            continue
+        bench(tree, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
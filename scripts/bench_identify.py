@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+
+# A mixed tree like public/: PNG, JPEG with EXIF and an ICC profile, WebP.
+MAKE = """
+import os, sys
+sys.path.insert(0, {vendor!r})
+from PIL import Image, ImageCms
+
+icc = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+exif = Image.Exif()
+exif[0x0112] = 6
+im = Image.effect_noise((480, 270), 40).convert("RGB")
+for i in range({count}):
+    folder = os.path.join({root!r}, f"dir{{i % 20}}")
+    os.makedirs(folder, exist_ok=True)
+    kind = i % 3
+    if kind == 0:
+        im.save(os.path.join(folder, f"{{i}}.png"))
+    elif kind == 1:
+        im.save(os.path.join(folder, f"{{i}}.jpg"), exif=exif, icc_profile=icc)
+    else:
+        im.save(os.path.join(folder, f"{{i}}.webp"), exif=exif)
+"""
+
+# Runs in a fresh interpreter so each method pays its own imports.
+CHILD = """
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {vendor!r})
+from PIL import Image, ImageIdentify
+
+root = {root!r}
+if {method!r} == "open":
+    records = {{}}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            with Image.open(path) as im:
+                records[path] = (im.format, im.size, im.mode, im.getexif().get(0x0112, 1), "icc_profile" in im.info)
+elif {method!r} == "identify":
+    records = {{}}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            records[path] = ImageIdentify.identify(path)
+else:
+    records = ImageIdentify.identify_all(root)
+print(json.dumps({{"time": time.perf_counter() - start, "count": len(records)}}))
+"""
+
+
+def run(code):
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reading image headers: Image.open vs ImageIdentify")
+    parser.add_argument("--root", default=None, help="tree to scan (default: a generated one)")
+    parser.add_argument("--count", type=int, default=3000, help="files in the generated tree")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root
+        if root is None:
+            root = tmp
+            subprocess.run([sys.executable, "-c", MAKE.format(vendor=str(VENDOR_DIR), root=root, count=args.count)], check=True)
+        print(f"{root}, best of {args.repeat} fresh interpreters (files are in the page cache)")
+        for label, method in (
+            ("Image.open         ", "open"),
+            ("identify           ", "identify"),
+            ("identify_all, pool ", "identify_all"),
+        ):
+            results = [run(CHILD.format(vendor=str(VENDOR_DIR), root=root, method=method)) for _ in range(args.repeat)]
+            best = min(result["time"] for result in results)
+            print(f"  {label} {results[0]['count']:6} files  {best * 1000:8.1f} ms  {best / results[0]['count'] * 1e6:6.1f} us/file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+VENDOR_DIR = SCRIPTS_DIR.parent / "_legacy" / "vendor" / "pillow"
+DAEMON = str(SCRIPTS_DIR / "image_daemon.py")
+
+# What a one-off build script does today: import PIL, handle one file, exit.
+SCRIPT = """
+import sys
+sys.path.insert(0, {vendor!r})
+from PIL import Image
+
+Image.init()
+with Image.open({src!r}) as im:
+    im.thumbnail((320, 320))
+    im.convert("RGB").save({dest!r}, "JPEG", quality=82)
+"""
+
+MAKE = """
+import sys
+sys.path.insert(0, {vendor!r})
+from PIL import Image
+
+Image.effect_noise(({width}, {height}), 40).convert("RGB").save({path!r})
+"""
+
+# The job alone, timed inside one warm process over one daemon connection.
+WARM = """
+import json, sys, time
+sys.path.insert(0, {scripts!r})
+import image_daemon
+
+job = {{"src": {src!r}, "dest": {dest!r}, "ops": [["thumbnail", [[320, 320]]], ["convert", ["RGB"]]],
+       "params": {{"quality": 82}}}}
+with image_daemon.connect({socket!r}) as client:
+    client.run(job)
+    times = []
+    for _ in range({repeat}):
+        start = time.perf_counter()
+        client.run(job)
+        times.append(time.perf_counter() - start)
+print(json.dumps(times))
+"""
+
+
+def timed(argv, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark one-image invocations: fresh interpreter vs warm daemon")
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = str(Path(tmp) / "source.png")
+        dest = str(Path(tmp) / "thumb.jpg")
+        sock = str(Path(tmp) / "daemon.sock")
+        subprocess.run(
+            [sys.executable, "-c", MAKE.format(vendor=str(VENDOR_DIR), width=args.width, height=args.height, path=src)],
+            check=True,
+        )
+        client = [sys.executable, DAEMON, "--socket", sock, "run", src, dest, "--thumbnail", "320", "--convert", "RGB"]
+        results = {
+            "script, imports PIL": timed([sys.executable, "-c", SCRIPT.format(vendor=str(VENDOR_DIR), src=src, dest=dest)], args.repeat),
+            "client, no daemon  ": timed(client, args.repeat),
+        }
+        daemon = subprocess.Popen(
+            [sys.executable, DAEMON, "--socket", sock, "serve", "--workers", str(args.workers)], stdout=subprocess.PIPE, text=True
+        )
+        try:
+            daemon.stdout.readline()
+            results["client, warm daemon"] = timed(client, args.repeat)
+            warm = subprocess.run(
+                [sys.executable, "-c", WARM.format(scripts=str(SCRIPTS_DIR), src=src, dest=dest, socket=sock, repeat=args.repeat)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results["job only (warm)    "] = [float(t) for t in warm.strip()[1:-1].split(",")]
+        finally:
+            subprocess.run([sys.executable, DAEMON, "--socket", sock, "stop"], check=True, capture_output=True)
+            daemon.wait()
+        bare = timed([sys.executable, "-c", "pass"], args.repeat)
+
+    print(f"{args.width}x{args.height} PNG -> 320px JPEG thumbnail, {args.repeat} runs each")
+    print(f"  interpreter startup  median {statistics.median(bare) * 1000:7.1f} ms")
+    for label, times in results.items():
+        print(f"  {label}  median {statistics.median(times) * 1000:7.1f} ms  min {min(times) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+sys.path.insert(0, str(VENDOR_DIR))
+
+from PIL import Image, ImageFile  # noqa: E402
+
+
+def sample_images(size):
+    base = Image.radial_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 40)
+    im = Image.merge("RGB", (base, noise, Image.linear_gradient("L").resize(size)))
+    out = {}
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=92, progressive=True)
+    out["progressive JPEG"] = buf.getvalue()
+    buf = io.BytesIO()
+    im.save(buf, "PNG")
+    out["PNG"] = buf.getvalue()
+    return out
+
+
+def decode_tiles(data, blocksize, legacy):
+    """Run the ImageFile.load feed loop; return bytes copied by the buffer."""
+    im = Image.open(io.BytesIO(data))
+    im.load_prepare()
+    read = getattr(im, "load_read", im.fp.read)
+    seek = getattr(im, "load_seek", im.fp.seek)
+    copied = 0
+    for decoder_name, extents, offset, args in sorted(im.tile, key=lambda t: t[2]):
+        seek(offset)
+        decoder = Image._getdecoder(im.mode, decoder_name, args, im.decoderconfig)
+        decoder.setimage(im.im, extents)
+        try:
+            if legacy:
+                # The pre-buffer loop: concatenate, decode, then trim. CPython
+                # returns the other operand unchanged when one side of the
+                # concatenation (or the trimmed slice) is empty, so only
+                # non-trivial cases count as copies.
+                b = b""
+                while True:
+                    s = read(blocksize)
+                    if not s:
+                        break
+                    if b:
+                        copied += len(b) + len(s)
+                    b = b + s
+                    n, err = decoder.decode(b)
+                    if n < 0:
+                        break
+                    if 0 < n < len(b):
+                        copied += len(b) - n
+                    b = b[n:]
+            else:
+                buffer = ImageFile._FeedBuffer(2 * blocksize)
+                if hasattr(im, "load_read"):
+                    readinto = getattr(im, "load_readinto", None)
+                else:
+                    readinto = im.fp.readinto
+                while True:
+                    if readinto:
+                        s = buffer.readinto(readinto, blocksize)
+                    else:
+                        s = read(blocksize)
+                    if not s:
+                        break
+                    n, err = buffer.decode(decoder, None if readinto else s)
+                    if n < 0:
+                        break
+                copied += buffer.copied
+        finally:
+            decoder.cleanup()
+    im.load_end()
+    return copied
+
+
+def bench(label, data, blocksize, repeat):
+    print(f"{label}: {len(data) / 1e6:.1f} MB, block {blocksize // 1024} KiB")
+    for legacy in (True, False):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            copied = decode_tiles(data, blocksize, legacy)
+            best = min(best, time.perf_counter() - start)
+        name = "bytes concat" if legacy else "feed buffer "
+        print(f"  {name}  copied {copied / 1e6:10.1f} MB  best {best * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ImageFile decoder feed loop")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--blocksize", type=int, default=ImageFile.MAXBLOCK)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    if args.files:
+        samples = {f: Path(f).read_bytes() for f in args.files}
+    else:
+        samples = sample_images((args.width, args.height))
+    for label, data in samples.items():
+        bench(label, data, args.blocksize, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+
+EXPRESSIONS = {
+    # The delta mask GifImagePlugin builds for optimized RGBA frames.
+    "gif delta mask": "convert(max(max(max(r, g), b), a) * 255, '1')",
+    "weighted blend": "convert((r * 3 + g * 5 + b * 8) / 16, 'L')",
+    "float levels  ": "convert(abs(float(r) - 128.0) * 1.5 + 16, 'L')",
+}
+
+# Runs in a fresh interpreter so ru_maxrss only sees one evaluation. "eager"
+# materializes every operator as soon as it is applied, which is what
+# ImageMath did before expressions were deferred and evaluated in strips.
+CHILD = """
+import hashlib, json, resource, sys, time
+sys.path.insert(0, {vendor!r})
+from PIL import Image, ImageMath
+
+if {eager!r}:
+    ImageMath._TILE_PIXELS = 1 << 62
+    apply = ImageMath._Operand.apply
+
+    def eager_apply(self, *args, **kwargs):
+        out = apply(self, *args, **kwargs)
+        out.im
+        return out
+
+    ImageMath._Operand.apply = eager_apply
+
+size = ({width}, {height})
+bands = {{
+    "r": Image.radial_gradient("L").resize(size),
+    "g": Image.linear_gradient("L").resize(size),
+    "b": Image.linear_gradient("L").rotate(90).resize(size),
+    "a": Image.new("L", size, 0),
+}}
+bands["a"].paste(255, (0, 0, size[0] // 3, size[1] // 3))
+ImageMath.unsafe_eval({expression!r}, **{{k: v.crop((0, 0, 8, 8)) for k, v in bands.items()}})
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+best = float("inf")
+for _ in range({repeat}):
+    start = time.perf_counter()
+    out = ImageMath.unsafe_eval({expression!r}, **bands)
+    best = min(best, time.perf_counter() - start)
+    digest = hashlib.sha256(out.tobytes()).hexdigest()
+    del out
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+print(json.dumps({{"best": best, "peak": peak, "digest": digest}}))
+"""
+
+
+def run(expression, eager, size, repeat):
+    code = CHILD.format(
+        vendor=str(VENDOR_DIR), eager=eager, width=size[0], height=size[1], expression=expression, repeat=repeat
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ImageMath: per-operator images vs strip evaluation")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size = (args.width, args.height)
+    print(f"{size[0]}x{size[1]} bands, peak is the RSS growth over the inputs")
+    for label, expression in EXPRESSIONS.items():
+        results = {name: run(expression, eager, size, args.repeat) for name, eager in (("eager", True), ("strips", False))}
+        same = len({result["digest"] for result in results.values()}) == 1
+        print(f"{label}  {expression}  (outputs {'identical' if same else 'DIFFER'})")
+        for name, result in results.items():
+            print(f"  {name:6}  best {result['best'] * 1000:7.1f} ms  peak {result['peak'] / 1024:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+LEGACY_DIR = Path(__file__).resolve().parent.parent / "_legacy"
+
+DEFAULT_FILES = [
+    LEGACY_DIR / "f" / "naver-thumb.png",
+    LEGACY_DIR / "f" / "og-thumb.jpg",
+]
+
+# Runs in a fresh interpreter: import PIL, identify and header-check each
+# file, the way a short-lived per-page CLI does. "legacy" reproduces the old
+# dispatch: preinit() always, and init() when none of its plugins accept.
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {vendor!r})
+from PIL import Image
+for path in {files!r}:
+    if {legacy!r}:
+        Image.preinit()
+        with open(path, "rb") as f:
+            prefix = f.read(16)
+        if not any(accept and accept(prefix) for _, accept in Image.OPEN.values()):
+            Image.init()
+    with Image.open(path) as im:
+        im.size
+elapsed = time.perf_counter() - start
+plugins = [m for m in sys.modules if m.startswith("PIL.") and m.endswith("Plugin")]
+print(json.dumps({{"elapsed": elapsed, "plugins": len(plugins)}}))
+"""
+
+
+def run(files, legacy, repeat):
+    code = CHILD.format(vendor=str(VENDOR_DIR), files=[str(f) for f in files], legacy=legacy)
+    wall, inner, plugins = [], [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        wall.append(time.perf_counter() - start)
+        result = json.loads(out)
+        inner.append(result["elapsed"])
+        plugins = result["plugins"]
+    return statistics.median(wall), statistics.median(inner), plugins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start Image.open benchmark for short-lived scripts")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES)
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files]
+    print(f"Files: {', '.join(f.name for f in files)} ({args.repeat} fresh interpreters each)")
+    for label, legacy in (("preinit/init dispatch", True), ("magic-byte dispatch  ", False)):
+        wall, inner, plugins = run(files, legacy, args.repeat)
+        print(
+            f"  {label}  process {wall * 1000:7.1f} ms  import+open {inner * 1000:7.1f} ms  "
+            f"plugins imported {plugins}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+sys.path.insert(0, str(VENDOR_DIR))
+
+from PIL import Image  # noqa: E402
+
+
+def source(size):
+    # Smooth gradients with some noise, so that filtering and matching both
+    # matter, as in a photographic master.
+    bands = (
+        Image.radial_gradient("L").resize(size),
+        Image.linear_gradient("L").resize(size),
+        Image.effect_noise(size, 24),
+    )
+    return Image.merge("RGB", bands)
+
+
+def best_save(im, repeat, **params):
+    best = float("inf")
+    for _ in range(repeat):
+        out = io.BytesIO()
+        start = time.perf_counter()
+        im.save(out, "PNG", **params)
+        best = min(best, time.perf_counter() - start)
+    return best, out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PNG save: one zlib stream vs compress_threads")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--threads", type=int, default=os.cpu_count())
+    parser.add_argument("--levels", default="1,3,6,9")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    im = source((args.width, args.height))
+    raw = len(im.tobytes())
+    print(f"{args.width}x{args.height} RGB ({raw / 2**20:.1f} MB raw), {args.threads} threads, best of {args.repeat}")
+    for level in (int(n) for n in args.levels.split(",")):
+        serial, serial_data = best_save(im, args.repeat, compress_level=level)
+        threaded, threaded_data = best_save(im, args.repeat, compress_level=level, compress_threads=args.threads)
+        assert Image.open(io.BytesIO(threaded_data)).tobytes() == im.tobytes()
+        print(
+            f"  level {level}  serial {serial * 1000:7.1f} ms  ratio {raw / len(serial_data):5.2f}"
+            f"   threaded {threaded * 1000:7.1f} ms  ratio {raw / len(threaded_data):5.2f}"
+            f"   speedup {serial / threaded:4.2f}x  size {len(threaded_data) / len(serial_data) - 1:+.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
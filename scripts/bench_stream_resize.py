@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+
+FORMATS = {
+    "PNG": ("png", {}),
+    "TIFF": ("tif", {}),
+    "JPEG": ("jpg", {"quality": 90}),
+}
+
+# Builds the source image a band at a time, so writing it does not need the
+# memory the benchmark is about.
+MAKE = """
+import sys
+sys.path.insert(0, {vendor!r})
+from PIL import Image
+
+size = ({width}, {height})
+im = Image.new("RGB", size)
+band = Image.merge("RGB", (
+    Image.radial_gradient("L").resize((size[0], 256)),
+    Image.linear_gradient("L").rotate(90).resize((size[0], 256)),
+    Image.effect_noise((size[0], 256), 40),
+))
+for y in range(0, size[1], 256):
+    im.paste(band, (0, y))
+im.save({path!r}, **{options!r})
+"""
+
+# Runs in a fresh interpreter so ru_maxrss only sees one resize. "resize"
+# loads the whole image first; "stream" reads it in strips.
+CHILD = """
+import hashlib, json, resource, sys, time
+sys.path.insert(0, {vendor!r})
+from PIL import Image, ImageOps
+
+Image.MAX_IMAGE_PIXELS = None
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+with Image.open({path!r}) as im:
+    if {stream!r}:
+        out = ImageOps.stream_resize(im, {size!r}, reducing_gap={gap!r})
+    else:
+        if {gap!r}:
+            im.draft(None, tuple(int(n * {gap!r}) for n in {size!r}))
+        out = im.resize({size!r})
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+print(json.dumps({{"time": elapsed, "peak": peak, "digest": hashlib.sha256(out.tobytes()).hexdigest()}}))
+"""
+
+
+def run(code):
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark downscaling a large image: full load vs strips")
+    parser.add_argument("--width", type=int, default=8000)
+    parser.add_argument("--height", type=int, default=8000)
+    parser.add_argument("--scale", type=int, default=10, help="downscale factor")
+    parser.add_argument("--formats", default=",".join(FORMATS), help=f"comma list of: {', '.join(FORMATS)}")
+    args = parser.parse_args()
+
+    size = (args.width // args.scale, args.height // args.scale)
+    print(f"{args.width}x{args.height} RGB -> {size[0]}x{size[1]}, peak is the RSS growth over the interpreter")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.formats.split(","):
+            ext, options = FORMATS[name]
+            path = str(Path(tmp) / f"source.{ext}")
+            run_make = MAKE.format(vendor=str(VENDOR_DIR), width=args.width, height=args.height, path=path, options=options)
+            subprocess.run([sys.executable, "-c", run_make], check=True)
+            # JPEG is decoded at a reduced scale by draft() in both cases.
+            gap = 2.0 if name == "JPEG" else None
+            results = {
+                label: run(CHILD.format(vendor=str(VENDOR_DIR), path=path, size=size, stream=stream, gap=gap))
+                for label, stream in (("resize", False), ("stream", True))
+            }
+            same = len({result["digest"] for result in results.values()}) == 1
+            print(f"{name} ({Path(path).stat().st_size / 2**20:.1f} MB file, outputs {'identical' if same else 'differ by rounding'})")
+            for label, result in results.items():
+                print(f"  {label:6}  {result['time'] * 1000:8.1f} ms  peak {result['peak'] / 1024:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+sys.path.insert(0, str(VENDOR_DIR))
+
+from PIL import Image, ImageIdentify  # noqa: E402
+
+from image_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, DerivativeCache, cache_key, file_hash, hit_rate  # noqa: E402
+
+WIDTHS = (480, 768, 1024, 1280)
+
+FORMATS = {
+    "avif": ("AVIF", {"quality": 60}),
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+THUMBS = {
+    "og-thumb.jpg": ((1200, 630), "JPEG", {"quality": 85, "optimize": True}),
+    "naver-thumb.png": ((1024, 1024), "PNG", {"optimize": True}),
+}
+
+SOURCE_EXTS = (".png", ".jpg", ".jpeg")
+VARIANT_RE = re.compile(r"^(.+)-(\d+)$")
+MANIFEST_VERSION = 1
+
+# Bump when decode_source, flatten, downscale or cover change what they
+# produce, so that derivatives cached by an older pipeline are not served.
+PIPELINE_VERSION = 3
+
+# EXIF orientation -> the transpose that turns a stored frame upright.
+UPRIGHT = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+# Sources that cannot be read are skipped with a warning.
+UNREADABLE = (OSError, SyntaxError, ValueError, Image.DecompressionBombError)
+
+
+def is_variant(p, widths, outputs):
+    # Only names this tool writes: one listed in the manifest, or <stem>-<w>
+    # for a configured width and format next to a source named <stem>.
+    if p.as_posix() in outputs:
+        return True
+    m = VARIANT_RE.match(p.stem)
+    if not m or int(m[2]) not in widths or p.suffix[1:].lower() not in FORMATS:
+        return False
+    return any(p.with_name(m[1] + ext).is_file() for ext in SOURCE_EXTS)
+
+
+def find_sources(root, widths, outputs=()):
+    sources = []
+    for p in sorted(root.rglob("*")):
+        if p.suffix.lower() not in SOURCE_EXTS or not p.is_file():
+            continue
+        if p.name in THUMBS or is_variant(p, widths, outputs):
+            continue
+        sources.append(p)
+    return sources
+
+
+def thumb_owners(sources):
+    # The first readable source of each directory gets its thumbs. Owners are
+    # picked before unchanged sources are skipped, so that a changed sibling
+    # never overwrites the thumbs of an unchanged owner.
+    owners = {}
+    dirs = set()
+    for src in sources:
+        if src.parent in dirs:
+            continue
+        try:
+            owners[src] = ImageIdentify.identify(src)
+        except UNREADABLE:
+            continue
+        dirs.add(src.parent)
+    return owners
+
+
+def manifest_outputs(root, manifest):
+    return {
+        (root / v["path"]).as_posix()
+        for entry in manifest.values()
+        for variants in entry.get("variants", {}).values()
+        for v in variants
+    }
+
+
+def params_key(widths, formats, thumbs):
+    spec = {
+        "widths": list(widths),
+        "formats": {ext: FORMATS[ext] for ext in formats},
+        "thumbs": {name: THUMBS[name] for name in thumbs},
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def flatten(im, keep_alpha):
+    if im.mode == "P":
+        im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+    if im.mode in ("RGBA", "LA") and not keep_alpha:
+        bg = Image.new("RGB", im.size, (0, 0, 0))
+        bg.paste(im, mask=im.getchannel("A"))
+        return bg
+    if im.mode not in ("RGB", "RGBA"):
+        im = im.convert("RGBA" if im.mode in ("LA", "PA") else "RGB")
+    return im
+
+
+def downscale(im, size):
+    # Integer box reduction first; it is far cheaper than a full-size
+    # resampling pass and leaves at most 2x for the Lanczos step.
+    factor = min(im.width // size[0], im.height // size[1]) // 2
+    if factor > 1:
+        im = im.reduce(factor)
+    if im.size != size:
+        im = im.resize(size, Image.Resampling.LANCZOS)
+    return im
+
+
+def cover(im, size):
+    tw, th = size
+    scale = max(tw / im.width, th / im.height)
+    w, h = max(tw, round(im.width * scale)), max(th, round(im.height * scale))
+    if (w, h) != im.size:
+        im = downscale(im, (w, h)) if w <= im.width else im.resize((w, h), Image.Resampling.LANCZOS)
+    left, top = (w - tw) // 2, (h - th) // 2
+    return im.crop((left, top, left + tw, top + th))
+
+
+def decode_source(src, widths, thumbs, orientation):
+    """Decode a source once and return every resized frame it fans out to."""
+    im = Image.open(src)
+    # Sizes are as displayed; frames are resized in stored orientation and
+    # only the small results are turned upright. The orientation is the one
+    # the manifest was planned with, so sizes and ladder agree with it.
+    swap = orientation in (5, 6, 7, 8)
+    size = (im.height, im.width) if swap else im.size
+
+    def stored(box):
+        return (box[1], box[0]) if swap else box
+
+    def upright(frame):
+        return frame.transpose(UPRIGHT[orientation]) if orientation in UPRIGHT else frame
+
+    ladder = sorted((w for w in widths if w <= size[0]), reverse=True)
+    scale = max(
+        [w / size[0] for w in ladder[:1]]
+        + [max(tw / size[0], th / size[1]) for tw, th in (THUMBS[n][0] for n in thumbs)]
+        or [1.0]
+    )
+    if scale < 1:
+        # Let the JPEG decoder scale by 1/2..1/8 during the IDCT; draft never
+        # goes below the requested size.
+        im.draft("RGB", (math.ceil(im.width * scale), math.ceil(im.height * scale)))
+    im.load()
+    im = flatten(im, keep_alpha=True)
+
+    frames = {}
+    prev = im
+    for w in ladder:
+        h = round(size[1] * w / size[0])
+        # Each rung is derived from the previous one, so the large source is
+        # only touched once.
+        prev = downscale(prev, stored((w, h)))
+        frames[w] = upright(prev)
+    for name in thumbs:
+        frames[name] = upright(cover(im, stored(THUMBS[name][0])))
+    return src, size, frames
+
+
+def encode_variant(im, out_path, fmt, params):
+    im = flatten(im, keep_alpha=fmt in ("WEBP", "AVIF", "PNG"))
+    tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    im.save(tmp, fmt, **params)
+    os.replace(tmp, out_path)
+    return out_path, im.size
+
+
+def variant_path(src, width, ext):
+    return src.with_name(f"{src.stem}-{width}.{ext}")
+
+
+def plan_outputs(src, size, widths, formats, thumbs):
+    for w in sorted(widths, reverse=True):
+        if w > size[0]:
+            continue
+        for ext in formats:
+            yield variant_path(src, w, ext), ext, w, FORMATS[ext]
+    for name in thumbs:
+        if isinstance(name, str):
+            _, fmt, params = THUMBS[name]
+            yield src.with_name(name), "thumb", name, (fmt, params)
+
+
+def output_size(size, name):
+    if isinstance(name, str):
+        return THUMBS[name][0]
+    return name, round(size[1] * name / size[0])
+
+
+def variant_ops(size, widths, thumbs, name):
+    # The cache key's op chain. Each rung is derived from the one above it,
+    # and the decode draft scale follows the largest rung and the thumbs, so
+    # a frame depends on the whole ladder and not only on its own size.
+    ladder = sorted((w for w in widths if w <= size[0]), reverse=True)
+    return [
+        ["pipeline", PIPELINE_VERSION, ladder, list(thumbs)],
+        ["variant", name, list(output_size(size, name))],
+    ]
+
+
+def record_output(entry, root, out, ext, size):
+    if ext == "thumb":
+        entry.setdefault("thumbs", []).append(out.name)
+        return
+    path = out.relative_to(root).as_posix() if out.is_relative_to(root) else out.as_posix()
+    entry["variants"][ext].append({"path": path, "width": size[0], "height": size[1]})
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("sources", {})
+
+
+def write_manifest(path, sources):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "sources": sources}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def srcset(entries):
+    return ", ".join(
+        f"{Path(e['path']).name} {e['width']}w" for e in sorted(entries, key=lambda e: e["width"])
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive image variants (srcset) in parallel")
+    parser.add_argument("--root", default="public")
+    parser.add_argument("--manifest", default=None, help="default: <root>/../.image-variants/manifest.json")
+    parser.add_argument("--widths", default=",".join(str(w) for w in WIDTHS))
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--thumbs", action="store_true", help="also emit og-thumb.jpg/naver-thumb.png per directory")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--stats", action="store_true", help="report derivative cache hit rate")
+    parser.add_argument("sources", nargs="*", help="explicit source images (default: scan --root)")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    manifest_path = Path(args.manifest) if args.manifest else root.parent / ".image-variants" / "manifest.json"
+    widths = tuple(int(w) for w in args.widths.split(",") if w)
+
+    Image.init()
+    formats = []
+    for ext in args.formats.split(","):
+        if ext not in FORMATS:
+            parser.error(f"unknown format: {ext}")
+        if FORMATS[ext][0] not in Image.SAVE:
+            print(f"[warn] {FORMATS[ext][0]} encoder unavailable in vendored PIL, skipping .{ext}")
+            continue
+        formats.append(ext)
+
+    manifest = load_manifest(manifest_path)
+    sources = [Path(s) for s in args.sources] or find_sources(root, widths, manifest_outputs(root, manifest))
+    owners = thumb_owners(sources) if args.thumbs else {}
+    key = params_key(widths, formats, THUMBS if args.thumbs else ())
+
+    cache = None if args.no_cache else DerivativeCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+
+    todo = []
+    entries = {}
+    skipped = 0
+    restored = 0
+    failed = set()
+    for src in sources:
+        rel = src.relative_to(root).as_posix() if src.is_relative_to(root) else src.as_posix()
+        try:
+            digest = file_hash(src)
+        except OSError as e:
+            print(f"[warn] skipping {rel}: {e}")
+            failed.add(rel)
+            continue
+        thumbs = tuple(THUMBS) if src in owners else ()
+        prev = manifest.get(rel)
+        if (
+            not args.force
+            and prev
+            and prev.get("hash") == digest
+            and prev.get("params") == key
+            and all((root / v["path"]).exists() for vs in prev["variants"].values() for v in vs)
+            and set(thumbs) <= set(prev.get("thumbs", ()))
+            and all((src.parent / name).exists() for name in thumbs)
+        ):
+            skipped += 1
+            continue
+
+        try:
+            identity = owners.get(src) or ImageIdentify.identify(src)
+        except UNREADABLE as e:
+            print(f"[warn] skipping {rel}: {e}")
+            failed.add(rel)
+            continue
+        size = identity.display_size
+        entries[rel] = {
+            "hash": digest,
+            "params": key,
+            "width": size[0],
+            "height": size[1],
+            "variants": {ext: [] for ext in formats},
+            "srcset": {},
+        }
+        missing = {}
+        for out, ext, name, (fmt, params) in plan_outputs(src, size, widths, formats, thumbs):
+            ckey = cache_key(digest, variant_ops(size, widths, thumbs, name), fmt, params)
+            if cache and not args.force and cache.get(ckey, out):
+                restored += 1
+                record_output(entries[rel], root, out, ext, output_size(size, name))
+            else:
+                missing[(name, ext)] = ckey
+        if missing:
+            todo.append((src, rel, thumbs, identity.orientation, missing))
+
+    start = time.perf_counter()
+    written = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        pending = {
+            pool.submit(decode_source, src, widths, thumbs, orientation): ("decode", rel, missing)
+            for src, rel, thumbs, orientation, missing in todo
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage, rel, tag = pending.pop(fut)
+                if stage == "decode":
+                    # Decode finished: fan the resized frames out as encode
+                    # jobs, skipping outputs already restored from the cache.
+                    missing = tag
+                    try:
+                        src, size, frames = fut.result()
+                    except UNREADABLE as e:
+                        print(f"[warn] skipping {rel}: {e}")
+                        failed.add(rel)
+                        del entries[rel]
+                        continue
+                    for out, ext, name, (fmt, params) in plan_outputs(src, size, widths, formats, tuple(frames)):
+                        if (name, ext) in missing:
+                            job = pool.submit(encode_variant, frames[name], out, fmt, params)
+                            pending[job] = ("encode", rel, (ext, missing[(name, ext)]))
+                else:
+                    ext, ckey = tag
+                    try:
+                        out, size = fut.result()
+                    except UNREADABLE as e:
+                        print(f"[warn] {rel}: {ext} variant not written: {e}")
+                        # Not up to date: rebuild the source on the next run.
+                        entries[rel]["params"] = None
+                        continue
+                    written += 1
+                    if cache:
+                        cache.put(ckey, out)
+                    record_output(entries[rel], root, out, ext, size)
+
+    for rel, entry in entries.items():
+        for ext, variants in entry["variants"].items():
+            entry["srcset"][ext] = srcset(variants)
+        manifest[rel] = entry
+    write_manifest(manifest_path, manifest)
+
+    elapsed = time.perf_counter() - start
+    print(f"Sources: {len(sources)} (decoded {sum(job[1] not in failed for job in todo)}, unchanged {skipped}, unreadable {len(failed)})")
+    print(f"Variants written: {written} in {elapsed:.2f}s using {args.jobs} workers")
+    if cache:
+        cache.close()
+        if args.stats:
+            print(f"Cache: {restored} restored, {written} encoded, hit rate {hit_rate(cache.hits, cache.misses):.1f}%")
+    print(f"Manifest: {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,17 @@ import argparse
 import os
 import sys
 import time
+import urllib.error
 import urllib.parse
 import urllib.request
 
+from http_validators import ValidatorCache, default_validator_path
+
 NAVER_UA = "Mozilla/5.0 (compatible; Yeti/1.1; +https://help.naver.com/robots)"
 DEFAULT_TIMEOUT = 15
 
 
-def fetch(url, user_agent, cache_bust=False):
+def fetch(url, user_agent, cache_bust=False, validators=None):
     target = url
     if cache_bust:
         parsed = urllib.parse.urlparse(url)
@@ -23,17 +26,36 @@ def fetch(url, user_agent, cache_bust=False):
     req.add_header("User-Agent", user_agent)
     req.add_header("Cache-Control", "no-cache")
     req.add_header("Pragma", "no-cache")
-    with urllib.request.urlopen(req, timeout=DEFAULT_TIMEOUT) as resp:
-        return resp.getcode(), resp.read(), resp.headers
-
-
-def wait_for_url(url, user_agent, retries, wait_s):
+    if validators is not None:
+        for name, value in validators.conditional_headers(url).items():
+            req.add_header(name, value)
+    try:
+        with urllib.request.urlopen(req, timeout=DEFAULT_TIMEOUT) as resp:
+            status, body, headers = resp.getcode(), resp.read(), resp.headers
+    except urllib.error.HTTPError as exc:
+        if exc.code != 304 or validators is None:
+            raise
+        cached = validators.revalidated(url)
+        if cached is not None:
+            return cached
+        return fetch(url, user_agent, cache_bust)
+    if validators is not None:
+        validators.store(url, status, headers, body)
+    return status, body, headers
+
+
+def wait_for_url(url, user_agent, retries, wait_s, validators=None, wait_for_change=False):
     last_status = None
+    previous = validators.content_hash(url) if validators is not None else None
     for _ in range(retries):
         try:
-            status, body, headers = fetch(url, user_agent, cache_bust=True)
+            status, body, headers = fetch(url, user_agent, cache_bust=True, validators=validators)
             last_status = status
-            if status == 200 and body:
+            # A 304 or an identical body hash means the URL serves what the
+            # previous check saw; with wait_for_change keep polling for the
+            # new deploy instead of accepting it.
+            unchanged = previous is not None and validators.content_hash(url) == previous
+            if status == 200 and (body or unchanged) and not (wait_for_change and unchanged):
                 return True, status, headers
         except Exception:
             pass
@@ -54,13 +76,31 @@ def main():
     parser.add_argument("--sitemap-url", default=None)
     parser.add_argument("--retries", type=int, default=20)
     parser.add_argument("--retry-wait", type=int, default=15)
+    parser.add_argument("--validator-cache", default=default_validator_path("deploy_verify"))
+    parser.add_argument(
+        "--no-validators",
+        action="store_true",
+        help="always download full bodies instead of sending If-None-Match/If-Modified-Since",
+    )
+    parser.add_argument(
+        "--wait-for-change",
+        action="store_true",
+        help="keep polling until the content hash differs from the cached one",
+    )
     args = parser.parse_args()
 
     site_url = args.site_url.rstrip("/") + "/"
     sitemap_url = args.sitemap_url or (site_url.rstrip("/") + "/sitemap.xml")
 
-    ok_site, status_site, headers_site = wait_for_url(site_url, NAVER_UA, args.retries, args.retry_wait)
-    ok_map, status_map, headers_map = wait_for_url(sitemap_url, NAVER_UA, args.retries, args.retry_wait)
+    validators = None if args.no_validators else ValidatorCache(args.validator_cache, "deploy_verify")
+    ok_site, status_site, headers_site = wait_for_url(
+        site_url, NAVER_UA, args.retries, args.retry_wait, validators, args.wait_for_change
+    )
+    ok_map, status_map, headers_map = wait_for_url(
+        sitemap_url, NAVER_UA, args.retries, args.retry_wait, validators, args.wait_for_change
+    )
+    if validators is not None:
+        validators.save()
 
     lines = []
     lines.append("## Deployment Verification")
@@ -76,6 +116,8 @@ def main():
     lines.append("")
     lines.append("Naver UA used: Yeti/1.1")
     lines.append("Cache busting: enabled")
+    if validators is not None:
+        lines.append(f"Conditional requests: {validators.revalidated_count} unchanged (304)")
 
     write_summary(lines)
 
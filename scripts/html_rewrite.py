@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+import copy
+import difflib
+import os
+import re
+from pathlib import Path
+
+class Rule:
+    """A precompiled substitution, applied to every match like ``re.sub``.
+
+    ``replace`` is either a replacement string (backreferences allowed) or a
+    callable ``replace(match, page)`` returning the new text. ``when(html,
+    page)`` switches the rule off for pages it does not apply to.
+    """
+
+    def __init__(self, pattern, replace, flags=0, when=None):
+        self.regex = re.compile(pattern, flags)
+        self.replace = replace
+        self.when = when
+
+    def substitute(self, match, page):
+        if callable(self.replace):
+            return self.replace(match, page)
+        if "\\" in self.replace:
+            return match.expand(self.replace)
+        return self.replace
+
+
+class Insert:
+    """Insert ``text`` before each ``anchor``; ``fallback(html)`` runs when
+    the page has no anchor at all."""
+
+    def __init__(self, anchor, text, flags=0, when=None, fallback=None):
+        self.anchor = anchor
+        self.text = text
+        self.flags = flags
+        self.when = when
+        self.fallback = fallback
+
+    def render(self, page):
+        return self.text(page) if callable(self.text) else self.text
+
+    def accepts(self, anchor):
+        return anchor == self.anchor or bool(self.flags & re.IGNORECASE)
+
+    def substitute(self, match, page):
+        return self.render(page) + match.group(0)
+
+
+class Rewriter:
+    """Apply a list of ``Rule``/``Insert`` objects to a page in one pass.
+
+    Every active rule keeps a cursor on its next match; the leftmost match
+    wins (ties go to the earlier rule), its replacement is emitted and the
+    cursors it overlapped search again from its end. Each rule still scans
+    with its own precompiled pattern, so literal-prefix searching stays
+    fast, but the page is walked and rebuilt once. Inserts sharing an anchor
+    are folded into one cursor and emitted in list order. Replacement text is
+    never rescanned: every rule sees the page as it was read, which matches
+    running the rules one after another as long as no rule targets another
+    rule's output.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._compiled = {}
+
+    def __add__(self, other):
+        return Rewriter(self.rules + other.rules)
+
+    def scoped(self, key):
+        """Copy whose rules read ``page[key]`` and only run when it is set.
+
+        This lets steps with different page contexts share one rewriter.
+        """
+        rules = []
+        for rule in self.rules:
+            rule = copy.copy(rule)
+            when = rule.when
+            if when is None:
+                rule.when = lambda html, page: key in page
+            else:
+                rule.when = lambda html, page, when=when: key in page and when(html, page[key])
+            if isinstance(rule, Insert) and callable(rule.text):
+                rule.text = lambda page, text=rule.text: text(page[key])
+            elif isinstance(rule, Rule) and callable(rule.replace):
+                rule.replace = lambda match, page, replace=rule.replace: replace(match, page[key])
+            rules.append(rule)
+        return Rewriter(rules)
+
+    def _compile(self, active):
+        compiled = self._compiled.get(active)
+        if compiled is not None:
+            return compiled
+        handlers = []
+        anchors = {}
+        for i in active:
+            rule = self.rules[i]
+            if not isinstance(rule, Insert):
+                handlers.append((rule.regex, rule))
+            elif rule.anchor.lower() in anchors:
+                anchors[rule.anchor.lower()].append(rule)
+            else:
+                anchors[rule.anchor.lower()] = group = [rule]
+                handlers.append((None, group))
+        for i, (regex, handler) in enumerate(handlers):
+            if regex is None:
+                # One cursor per anchor; it ignores case if any insert does,
+                # and each insert then checks the matched text itself.
+                flags = re.IGNORECASE if any(ins.flags & re.IGNORECASE for ins in handler) else 0
+                handlers[i] = (re.compile(re.escape(handler[0].anchor), flags), handler)
+        self._compiled[active] = handlers
+        return handlers
+
+    def active(self, html, page):
+        return tuple(i for i, rule in enumerate(self.rules) if rule.when is None or rule.when(html, page))
+
+    def apply(self, html, page=None):
+        active = self.active(html, page)
+        if not active:
+            return html
+        handlers = self._compile(active)
+        anchored = set()
+        cursors = [regex.search(html) for regex, _ in handlers]
+        out = []
+        pos = 0
+        while True:
+            best = index = None
+            for i, match in enumerate(cursors):
+                if match is not None and match.start() < pos:
+                    match = cursors[i] = handlers[i][0].search(html, pos)
+                if match is not None and (best is None or match.start() < best.start()):
+                    best, index = match, i
+            if best is None:
+                break
+            out.append(html[pos:best.start()])
+            handler = handlers[index][1]
+            if isinstance(handler, list):
+                for ins in handler:
+                    if ins.accepts(best.group(0)):
+                        anchored.add(id(ins))
+                        out.append(ins.render(page))
+                out.append(best.group(0))
+            else:
+                out.append(handler.substitute(best, page))
+            pos = best.end()
+            if best.end() == best.start():
+                # Step over empty matches the way re.sub does.
+                out.append(html[pos:pos + 1])
+                pos += 1
+                cursors[index] = handlers[index][0].search(html, pos) if pos <= len(html) else None
+        out.append(html[pos:])
+        html = "".join(out)
+        for _, handler in handlers:
+            if isinstance(handler, list):
+                for ins in handler:
+                    if id(ins) not in anchored and ins.fallback is not None:
+                        html = ins.fallback(html)
+        return html
+
+    def apply_each(self, html, page=None):
+        """Reference path: one ``re.sub`` per rule over the whole page."""
+        for i in self.active(html, page):
+            rule = self.rules[i]
+            if isinstance(rule, Insert):
+                regex = re.compile(re.escape(rule.anchor), rule.flags)
+                if not regex.search(html):
+                    if rule.fallback is not None:
+                        html = rule.fallback(html)
+                    continue
+            else:
+                regex = rule.regex
+            html = regex.sub(lambda m, rule=rule: rule.substitute(m, page), html)
+        return html
+
+
+def atomic_write(path, text):
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def unified_diff(path, before, after):
+    return "".join(
+        difflib.unified_diff(
+            before.splitlines(keepends=True),
+            after.splitlines(keepends=True),
+            fromfile=f"a/{path}",
+            tofile=f"b/{path}",
+        )
+    )
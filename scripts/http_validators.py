@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import threading
+from pathlib import Path
+
+def default_validator_path(tool):
+    # Each tool stores different entries for the same URLs, so they do not
+    # share a file by default.
+    return f".http-validators-{tool}.json"
+
+
+def body_hash(body):
+    if not isinstance(body, (bytes, bytearray)):
+        body = json.dumps(body, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(body).hexdigest()
+
+
+class ValidatorCache:
+    """ETag/Last-Modified validators and a content hash per URL.
+
+    ``conditional_headers`` turns a stored entry into ``If-None-Match`` /
+    ``If-Modified-Since``; a 304 answer is then served by ``revalidated``
+    from the stored status, headers and ``data`` without a body transfer.
+    Keys are the URL as the caller names it, so pass it before any
+    cache-busting query is added. Entries are namespaced by ``tool``, and
+    callers that answer from ``data`` pass ``data=True`` so that an entry
+    stored with only a body hash is never used in its place.
+    """
+
+    def __init__(self, path, tool):
+        self.path = Path(path)
+        self.tool = tool
+        self.revalidated_count = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _key(self, url):
+        return f"{self.tool} {url}"
+
+    def _entry(self, url, data):
+        # An entry without the shape the caller needs counts as a miss.
+        with self._lock:
+            entry = self.entries.get(self._key(url))
+        if not isinstance(entry, dict) or ("data" in entry) != data:
+            return None
+        return entry
+
+    def conditional_headers(self, url, data=False):
+        entry = self._entry(url, data)
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def content_hash(self, url):
+        with self._lock:
+            return self.entries.get(self._key(url), {}).get("hash")
+
+    def store(self, url, status, headers, body=b"", data=None):
+        """Record a 2xx response; return True when its content hash changed."""
+        digest = body_hash(body if data is None else data)
+        length = headers.get("Content-Length")
+        entry = {
+            "status": status,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "length": int(length) if length and length.isdigit() else len(body),
+            "hash": digest,
+        }
+        if data is not None:
+            entry["data"] = data
+        with self._lock:
+            prev = self.entries.get(self._key(url))
+            self.entries[self._key(url)] = entry
+        return prev is None or prev.get("hash") != digest
+
+    def revalidated(self, url, data=False):
+        """Answer a 304 for ``url``: ``(status, data, headers)`` as last stored.
+
+        Returns None when there is no usable entry; fetch again without
+        validators then.
+        """
+        entry = self._entry(url, data)
+        if entry is None:
+            return None
+        with self._lock:
+            self.revalidated_count += 1
+            self.bytes_saved += entry.get("length") or 0
+        headers = http.client.HTTPMessage()
+        for name, key in (("ETag", "etag"), ("Last-Modified", "last_modified"), ("Content-Type", "content_type")):
+            if entry.get(key):
+                headers[name] = entry[key]
+        return entry["status"], entry.get("data", b""), headers
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with self._lock, open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the HTTP validator cache")
+    parser.add_argument("--tool", default="og_check", choices=("og_check", "deploy_verify"))
+    parser.add_argument("--path", default=None, help="default: the tool's own validator file")
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+    args.path = args.path or default_validator_path(args.tool)
+
+    if args.clear:
+        Path(args.path).unlink(missing_ok=True)
+        print(f"Cleared {args.path}")
+        return
+
+    cache = ValidatorCache(args.path, args.tool)
+    for key, entry in sorted(cache.entries.items()):
+        validator = entry.get("etag") or entry.get("last_modified") or "-"
+        print(f"{key}  {entry['status']}  {entry['hash'][:12]}  {validator}")
+    print(f"{len(cache.entries)} URLs in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
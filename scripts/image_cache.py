@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+sys.path.insert(0, str(VENDOR_DIR))
+
+from PIL import Image  # noqa: E402
+
+DEFAULT_CACHE_DIR = ".image-cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def apply_ops(im, ops):
+    """Apply ``(name, args)`` pairs to ``im`` in order; see ``DerivativeCache.derive``."""
+    for name, args in ops:
+        if name == "thumbnail":
+            im.thumbnail(*args)
+        else:
+            im = getattr(im, name)(*args)
+    return im
+
+
+def cache_key(source_hash, ops, fmt, params):
+    # The PIL version is part of the key so an encoder upgrade never serves
+    # bytes produced by the old one.
+    spec = [source_hash, ops, fmt, params, Image.__version__]
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=list).encode()).hexdigest()
+
+
+class DerivativeCache:
+    """Content-addressed store for encoded image derivatives.
+
+    Entries are keyed by (source bytes hash, operation chain, encoder
+    params). Recency is tracked through each object's mtime, which is bumped
+    on every hit, and ``prune`` evicts least recently used objects until the
+    store fits in ``max_bytes``.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+
+    def _object(self, key):
+        return self.root / "objects" / key[:2] / key
+
+    def get(self, key, dest):
+        """Copy a cached derivative to ``dest``; return False on a miss."""
+        obj = self._object(key)
+        try:
+            size = obj.stat().st_size
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        dest = Path(dest)
+        tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+        shutil.copyfile(obj, tmp)
+        os.replace(tmp, dest)
+        now = time.time()
+        os.utime(obj, (now, now))
+        self.hits += 1
+        self.bytes_served += size
+        return True
+
+    def put(self, key, path):
+        obj = self._object(key)
+        obj.parent.mkdir(exist_ok=True)
+        tmp = obj.with_name(f".{key}.{os.getpid()}.tmp")
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, obj)
+
+    def derive(self, src, dest, ops, fmt, params, source_hash=None):
+        """Produce ``dest`` from ``src`` via ``ops``, doing no pixel work on a hit.
+
+        ``ops`` is a list of ``(name, args)`` pairs applied in order, where
+        ``name`` is an ``Image`` method such as ``"thumbnail"``, ``"resize"``,
+        ``"reduce"``, ``"crop"`` or ``"convert"`` and ``args`` its positional
+        arguments, e.g. ``[("thumbnail", [(480, 480)]), ("convert", ["RGB"])]``.
+        """
+        key = cache_key(source_hash or file_hash(src), ops, fmt, params)
+        if self.get(key, dest):
+            return True
+        with Image.open(src) as im:
+            im = apply_ops(im, ops)
+            dest = Path(dest)
+            tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+            im.save(tmp, fmt, **params)
+        os.replace(tmp, dest)
+        self.put(key, dest)
+        return False
+
+    def usage(self):
+        entries = []
+        for obj in (self.root / "objects").glob("*/*"):
+            if obj.name.startswith("."):
+                continue
+            st = obj.stat()
+            entries.append((st.st_mtime, st.st_size, obj))
+        return entries
+
+    def prune(self, max_bytes=None):
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.usage())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, obj in entries:
+            if total <= limit:
+                break
+            obj.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        return evicted, total
+
+    def _stats_path(self):
+        return self.root / "stats.json"
+
+    def load_stats(self):
+        try:
+            with open(self._stats_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0, "bytes_served": 0, "runs": 0}
+
+    def close(self):
+        """Fold this run's counters into the persistent stats and prune."""
+        stats = self.load_stats()
+        stats["hits"] += self.hits
+        stats["misses"] += self.misses
+        stats["bytes_served"] += self.bytes_served
+        stats["runs"] += 1
+        stats["last_run"] = {"hits": self.hits, "misses": self.misses}
+        tmp = self._stats_path().with_name("stats.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp, self._stats_path())
+        self.prune()
+
+
+def hit_rate(hits, misses):
+    total = hits + misses
+    return (hits / total * 100) if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image derivative cache maintenance")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    parser.add_argument("--stats", action="store_true", help="print hit rate and size report")
+    parser.add_argument("--prune", action="store_true", help="evict LRU entries down to --max-mb")
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    if args.clear:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+        print(f"Cleared {args.cache_dir}")
+        return
+
+    cache = DerivativeCache(args.cache_dir, args.max_mb * 1024 * 1024)
+    if args.prune:
+        evicted, total = cache.prune()
+        print(f"Evicted {evicted} entries, {total / 1e6:.1f} MB remaining")
+
+    if args.stats or not args.prune:
+        stats = cache.load_stats()
+        entries = cache.usage()
+        total = sum(size for _, size, _ in entries)
+        last = stats.get("last_run", {"hits": 0, "misses": 0})
+        print(f"Cache: {cache.root} ({len(entries)} entries, {total / 1e6:.1f} MB of {args.max_mb} MB)")
+        print(f"Runs: {stats['runs']}")
+        print(
+            f"Hits: {stats['hits']}  Misses: {stats['misses']}  "
+            f"Hit rate: {hit_rate(stats['hits'], stats['misses']):.1f}%"
+        )
+        print(f"Last run hit rate: {hit_rate(last['hits'], last['misses']):.1f}%")
+        print(f"Bytes served from cache: {stats['bytes_served'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
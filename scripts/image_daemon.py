@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Warm image worker daemon.
+
+``serve`` imports the vendored PIL and every plugin once, then forks a pool of
+workers that accept jobs on a Unix socket, so a short-lived script pays for a
+socket round trip instead of the PIL import. A job opens ``src``, applies an
+op chain in the ``DerivativeCache.derive`` format and saves ``dest``::
+
+    {"src": "in.png", "dest": "out.jpg", "ops": [["thumbnail", [[480, 480]]], ["convert", ["RGB"]]],
+     "format": "JPEG", "params": {"quality": 82}}
+
+``run_job``/``run_jobs`` send jobs to the daemon and run them in-process when it
+is not running. This module does not import PIL itself, so a client that finds
+the daemon never pays for it.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "_legacy" / "vendor" / "pillow"
+
+# Methods a job may apply; anything else on Image (save, close, ...) is refused.
+OPS = {"thumbnail", "resize", "reduce", "crop", "convert", "rotate", "transpose"}
+
+# Workers are replaced after this many connections to bound leaked memory.
+MAX_CONNECTIONS = 1000
+
+
+class JobError(Exception):
+    """A job failed, in the daemon or in-process; the message names the cause."""
+
+
+def default_socket():
+    path = os.environ.get("PIL_IMAGE_DAEMON")
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "pil-image-daemon.sock")
+    return os.path.join(tempfile.gettempdir(), f"pil-image-daemon-{os.getuid()}.sock")
+
+
+def _import_pil():
+    for path in (str(VENDOR_DIR), str(Path(__file__).resolve().parent)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    from PIL import Image
+
+    import image_cache
+
+    Image.init()
+    return Image, image_cache
+
+
+def normalize_job(job):
+    # The daemon has its own working directory, so paths are resolved here.
+    ops = [[name, list(args)] for name, args in job.get("ops", ())]
+    for name, _ in ops:
+        if name not in OPS:
+            raise JobError(f"unsupported op: {name}")
+    return {
+        "src": os.path.abspath(job["src"]),
+        "dest": os.path.abspath(job["dest"]),
+        "ops": ops,
+        "format": job.get("format"),
+        "params": dict(job.get("params") or {}),
+    }
+
+
+def process_job(job):
+    """Run a normalized job in this process and return the saved image's details."""
+    Image, image_cache = _import_pil()
+    dest = Path(job["dest"])
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    try:
+        with Image.open(job["src"]) as im:
+            im = image_cache.apply_ops(im, job["ops"])
+            fmt = job["format"] or Image.registered_extensions().get(dest.suffix.lower())
+            if fmt is None:
+                raise ValueError(f"unknown file extension: {dest.suffix}")
+            im.save(tmp, fmt, **job["params"])
+            size, mode = im.size, im.mode
+        os.replace(tmp, dest)
+    except Exception as e:
+        tmp.unlink(missing_ok=True)
+        raise JobError(f"{type(e).__name__}: {e}") from e
+    return {"dest": str(dest), "size": list(size), "mode": mode}
+
+
+class DaemonClient:
+    """A connection to a running daemon; jobs on it run one at a time."""
+
+    def __init__(self, path=None, timeout=None):
+        self.path = path or default_socket()
+        # Refuse a socket someone else planted in a shared directory.
+        if os.stat(self.path).st_uid != os.getuid():
+            raise PermissionError(f"{self.path} is not owned by this user")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(self.path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, message):
+        self.file.write(json.dumps(message).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("image daemon closed the connection")
+        reply = json.loads(line)
+        if not reply["ok"]:
+            raise JobError(reply["error"])
+        return reply.get("result")
+
+    def run(self, job):
+        return self.request({"op": "job", "job": normalize_job(job)})
+
+    def ping(self):
+        return self.request({"op": "ping"})
+
+    def shutdown(self):
+        return self.request({"op": "shutdown"})
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def connect(path=None, timeout=None):
+    """Return a ``DaemonClient``, or None when no daemon is listening."""
+    try:
+        return DaemonClient(path, timeout)
+    except OSError:
+        return None
+
+
+def run_jobs(jobs, path=None):
+    """Run jobs over one daemon connection, or in-process when there is none."""
+    jobs = [normalize_job(job) for job in jobs]
+    client = connect(path)
+    if client is None:
+        return [process_job(job) for job in jobs]
+    with client:
+        return [client.request({"op": "job", "job": job}) for job in jobs]
+
+
+def run_job(job, path=None):
+    return run_jobs([job], path)[0]
+
+
+def _handle(line, state):
+    try:
+        message = json.loads(line)
+        op = message.get("op")
+        if op == "job":
+            result = process_job(normalize_job(message["job"]))
+            state["jobs"] += 1
+        elif op == "ping":
+            result = {"pid": os.getppid(), "worker": os.getpid(), "jobs": state["jobs"]}
+        elif op == "shutdown":
+            os.kill(os.getppid(), signal.SIGTERM)
+            result = None
+        else:
+            raise JobError(f"unknown request: {op}")
+    except Exception as e:
+        return {"ok": False, "error": str(e) if isinstance(e, JobError) else f"{type(e).__name__}: {e}"}
+    return {"ok": True, "result": result}
+
+
+def _worker(sock):
+    state = {"busy": False, "stop": False, "jobs": 0}
+
+    def stop(signum, frame):
+        # Never abandon a job halfway; an idle worker can just leave.
+        if not state["busy"]:
+            raise SystemExit(0)
+        state["stop"] = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(MAX_CONNECTIONS):
+        conn, _ = sock.accept()
+        with conn, conn.makefile("rwb") as f:
+            try:
+                for line in f:
+                    state["busy"] = True
+                    f.write(json.dumps(_handle(line, state)).encode() + b"\n")
+                    f.flush()
+                    state["busy"] = False
+                    if state["stop"]:
+                        return
+            except OSError:
+                # The client went away mid-reply.
+                state["busy"] = False
+        if state["stop"]:
+            return
+
+
+def _listen(path):
+    if os.path.exists(path):
+        client = connect(path)
+        if client is not None:
+            client.close()
+            raise SystemExit(f"an image daemon is already listening on {path}")
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old)
+    sock.listen(64)
+    return sock
+
+
+def serve(path, workers):
+    _import_pil()
+    sock = _listen(path)
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                _worker(sock)
+                code = 0
+            except SystemExit as e:
+                code = e.code or 0
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        for _ in range(workers):
+            spawn()
+        print(f"image daemon {os.getpid()} listening on {path} with {workers} workers", flush=True)
+        while children:
+            pid, _ = os.wait()
+            children.discard(pid)
+            if not stopping:
+                spawn()
+    finally:
+        sock.close()
+        os.unlink(path)
+
+
+def parse_size(text):
+    w, _, h = text.partition("x")
+    return [int(w), int(h or w)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm PIL worker daemon and client")
+    parser.add_argument("--socket", default=None, help="default: $PIL_IMAGE_DAEMON or a per-user socket")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="preload PIL and serve jobs until stopped")
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    sub.add_parser("status", help="check whether a daemon is running")
+    sub.add_parser("stop", help="stop a running daemon")
+    p = sub.add_parser("run", help="open SRC, apply ops and save DEST (in-process if no daemon)")
+    p.add_argument("src")
+    p.add_argument("dest")
+    p.add_argument("--thumbnail", type=parse_size, help="WxH bounding box")
+    p.add_argument("--convert", help="mode to convert to after resizing")
+    p.add_argument("--format", default=None, help="default: from the DEST extension")
+    p.add_argument("--params", type=json.loads, default={}, help='save options as JSON, e.g. \'{"quality": 82}\'')
+    args = parser.parse_args()
+
+    path = args.socket or default_socket()
+    if args.command == "serve":
+        serve(path, args.workers)
+        return
+    if args.command == "run":
+        ops = []
+        if args.thumbnail:
+            ops.append(["thumbnail", [args.thumbnail]])
+        if args.convert:
+            ops.append(["convert", [args.convert]])
+        job = {"src": args.src, "dest": args.dest, "ops": ops, "format": args.format, "params": args.params}
+        try:
+            result = run_job(job, path)
+        except JobError as e:
+            raise SystemExit(f"{args.src}: {e}")
+        print(f"{result['dest']}: {result['size'][0]}x{result['size'][1]} {result['mode']}")
+        return
+
+    client = connect(path)
+    if client is None:
+        print(f"No image daemon on {path}")
+        sys.exit(1)
+    with client:
+        if args.command == "status":
+            info = client.ping()
+            print(f"Image daemon {info['pid']} on {path} (worker {info['worker']}, {info['jobs']} jobs)")
+        else:
+            client.shutdown()
+            print(f"Stopped image daemon on {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 import re
 from pathlib import Path
 
+from html_rewrite import Insert, Rewriter, Rule
+
 SITE_URL = "https://informationa.pages.dev"
 DATE = "2026-02-03"
 DATE_TIME = "2026-02-03T00:00:00+09:00"
@@ -89,32 +91,22 @@ def build_article(name, area, has_article=True):
     return f"<div class=\"content\">\n\n{content}\n</div>\n"
 
 
-def update_head(html, name, slug, area):
-    title = f"{name} 안내 | 위치·이용 전 확인사항"
-    desc = f"{name} 이용 전 확인할 위치, 운영, 출입 안내를 간단히 정리했습니다."
-
-    def repl(pattern, replacement):
-        nonlocal html
-        html = re.sub(pattern, replacement, html, flags=re.IGNORECASE)
-
-    repl(r"<title>.*?</title>", f"<title>{title}</title>")
-    repl(r"<meta name=\"description\" content=\".*?\">", f"<meta name=\"description\" content=\"{desc}\">")
-    repl(r"<meta name=\"date\" content=\".*?\">", f"<meta name=\"date\" content=\"{DATE}\">")
-    repl(r"<meta name=\"last-modified\" content=\".*?\">", f"<meta name=\"last-modified\" content=\"{DATE}\">")
+def page_context(path, meta, html):
+    name = meta["name"]
+    return {
+        "name": name,
+        "slug": Path(path).parent.name,
+        "area": meta["area"],
+        "title": f"{name} 안내 | 위치·이용 전 확인사항",
+        "desc": f"{name} 이용 전 확인할 위치, 운영, 출입 안내를 간단히 정리했습니다.",
+        "date": DATE,
+        "date_time": DATE_TIME,
+        "has_article": "<article class=\"wrap\">" in html,
+    }
 
-    repl(r"<meta property=\"article:published_time\" content=\".*?\">", f"<meta property=\"article:published_time\" content=\"{DATE_TIME}\">")
-    repl(r"<meta property=\"article:modified_time\" content=\".*?\">", f"<meta property=\"article:modified_time\" content=\"{DATE_TIME}\">")
-
-    repl(r"<meta property=\"og:title\" content=\".*?\">", f"<meta property=\"og:title\" content=\"{title}\">")
-    repl(r"<meta property=\"og:description\" content=\".*?\">", f"<meta property=\"og:description\" content=\"{desc}\">")
-    repl(r"<meta property=\"og:image:alt\" content=\".*?\">", f"<meta property=\"og:image:alt\" content=\"{name} 안내 이미지\">")
-
-    repl(r"<meta name=\"twitter:title\" content=\".*?\">", f"<meta name=\"twitter:title\" content=\"{title}\">")
-    repl(r"<meta name=\"twitter:description\" content=\".*?\">", f"<meta name=\"twitter:description\" content=\"{desc}\">")
-
-    # Remove existing JSON-LD blocks
-    html = re.sub(r"<script type=\"application/ld\+json\">.*?</script>", "", html, flags=re.DOTALL)
 
+def build_jsonld(page):
+    name, slug, area, title, desc = page["name"], page["slug"], page["area"], page["title"], page["desc"]
     url = f"{SITE_URL}/{slug}/"
     jsonld = f"""
 <script type=\"application/ld+json\">
@@ -197,67 +189,88 @@ def update_head(html, name, slug, area):
 }}
 </script>
 """
+    return jsonld
+
+
+def fill(template):
+    return lambda match, page: template.format_map(page)
+
+
+def has_article(html, page):
+    return page["has_article"]
 
-    html = re.sub(r"</head>", jsonld + "</head>", html, flags=re.IGNORECASE)
-    return html
 
+def no_article(html, page):
+    return not page["has_article"]
 
-def cleanup_body(html, name, area, has_article):
+
+HEAD_RULES = [
+    Rule(r"<title>.*?</title>", fill("<title>{title}</title>"), re.IGNORECASE),
+    Rule(r"<meta name=\"description\" content=\".*?\">", fill("<meta name=\"description\" content=\"{desc}\">"), re.IGNORECASE),
+    Rule(r"<meta name=\"date\" content=\".*?\">", fill("<meta name=\"date\" content=\"{date}\">"), re.IGNORECASE),
+    Rule(r"<meta name=\"last-modified\" content=\".*?\">", fill("<meta name=\"last-modified\" content=\"{date}\">"), re.IGNORECASE),
+
+    Rule(r"<meta property=\"article:published_time\" content=\".*?\">", fill("<meta property=\"article:published_time\" content=\"{date_time}\">"), re.IGNORECASE),
+    Rule(r"<meta property=\"article:modified_time\" content=\".*?\">", fill("<meta property=\"article:modified_time\" content=\"{date_time}\">"), re.IGNORECASE),
+
+    Rule(r"<meta property=\"og:title\" content=\".*?\">", fill("<meta property=\"og:title\" content=\"{title}\">"), re.IGNORECASE),
+    Rule(r"<meta property=\"og:description\" content=\".*?\">", fill("<meta property=\"og:description\" content=\"{desc}\">"), re.IGNORECASE),
+    Rule(r"<meta property=\"og:image:alt\" content=\".*?\">", fill("<meta property=\"og:image:alt\" content=\"{name} 안내 이미지\">"), re.IGNORECASE),
+
+    Rule(r"<meta name=\"twitter:title\" content=\".*?\">", fill("<meta name=\"twitter:title\" content=\"{title}\">"), re.IGNORECASE),
+    Rule(r"<meta name=\"twitter:description\" content=\".*?\">", fill("<meta name=\"twitter:description\" content=\"{desc}\">"), re.IGNORECASE),
+
+    # Remove existing JSON-LD blocks
+    Rule(r"<script type=\"application/ld\+json\">.*?</script>", "", re.DOTALL),
+    Insert("</head>", build_jsonld, re.IGNORECASE),
+]
+
+BODY_RULES = [
     # Remove age-gate overlay if present
-    html = re.sub(r"<div id=\"age-gate\"[\s\S]*?</div>\s*", "", html)
-    html = re.sub(r"<!-- 성인 확인 오버레이 -->[\s\S]*?<div style=\"background:#1a1a1a", "<div style=\"background:#1a1a1a", html)
+    Rule(r"<div id=\"age-gate\"[\s\S]*?</div>\s*", ""),
+    Rule(r"<!-- 성인 확인 오버레이 -->[\s\S]*?(?=<div style=\"background:#1a1a1a)", ""),
 
     # Replace main content
-    if has_article:
-        html = re.sub(r"<article class=\"wrap\">[\s\S]*?</article>", build_article(name, area, True), html)
-    else:
-        html = re.sub(r"<div class=\"content\">[\s\S]*?</div>", build_article(name, area, False), html)
+    Rule(r"<article class=\"wrap\">[\s\S]*?</article>", lambda m, page: build_article(page["name"], page["area"], True), when=has_article),
+    Rule(r"<div class=\"content\">[\s\S]*?</div>", lambda m, page: build_article(page["name"], page["area"], False), when=no_article),
 
     # Replace notice block if present
-    html = re.sub(r"<div class=\"notice\">[\s\S]*?</div>", NOTICE_HTML, html)
-    html = re.sub(r"<div class=\"disclaimer\">[\s\S]*?</div>", NOTICE_HTML, html)
+    Rule(r"<div class=\"notice\">[\s\S]*?</div>", NOTICE_HTML),
+    Rule(r"<div class=\"disclaimer\">[\s\S]*?</div>", NOTICE_HTML),
 
     # Remove promo blocks (제휴문의/카톡/연락처)
-    html = re.sub(r"<div[^>]*>[^<]*제휴문의[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"contact-info\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div[^>]*>[^<]*카톡 ID:[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"profile-card\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"card\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"checklist\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"timeline\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"check-item\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"faq-block\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"route-item\">[\s\S]*?</div>", "", html)
-    html = re.sub(r"<div class=\"faq-a\">[^<]*(입장료|예약|요금|전화|바 좌석)[^<]*</div>", "", html)
+    Rule(r"<div[^>]*>[^<]*제휴문의[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"contact-info\">[\s\S]*?</div>", ""),
+    Rule(r"<div[^>]*>[^<]*카톡 ID:[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"profile-card\">[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"card\">[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"checklist\">[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"timeline\">[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"check-item\">[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"faq-block\">[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"route-item\">[\s\S]*?</div>", ""),
+    Rule(r"<div class=\"faq-a\">[^<]*(입장료|예약|요금|전화|바 좌석)[^<]*</div>", ""),
 
     # Normalize taglines/subtitles
-    html = re.sub(r"<p class=\"tagline\">[\s\S]*?</p>", "<p class=\"tagline\">이용 전 확인 사항을 간단히 정리했습니다.</p>", html)
-    html = re.sub(r"<p class=\"sub\">[\s\S]*?</p>", "<p class=\"sub\">이용 전 확인 사항을 간단히 정리했습니다.</p>", html)
-    html = re.sub(r"<div class=\"ci-number\">[^<]*</div>", "", html)
+    Rule(r"<p class=\"tagline\">[\s\S]*?</p>", "<p class=\"tagline\">이용 전 확인 사항을 간단히 정리했습니다.</p>"),
+    Rule(r"<p class=\"sub\">[\s\S]*?</p>", "<p class=\"sub\">이용 전 확인 사항을 간단히 정리했습니다.</p>"),
+    Rule(r"<div class=\"ci-number\">[^<]*</div>", ""),
 
     # Normalize main H1 if it uses gold span pattern
-    html = re.sub(
+    Rule(
         r"<h1><span class=\"gold\">[^<]*</span><br>[^<]*</h1>",
-        f"<h1><span class=\"gold\">{name}</span><br>이용 안내</h1>",
-        html,
-    )
+        fill("<h1><span class=\"gold\">{name}</span><br>이용 안내</h1>"),
+    ),
+]
 
-    return html
+RULES = Rewriter(HEAD_RULES + BODY_RULES)
 
 
 def main():
-    for path, meta in PAGES.items():
-        p = Path(path)
-        html = p.read_text(encoding="utf-8")
-        slug = p.parent.name
-        name = meta["name"]
-        area = meta["area"]
-        has_article = "<article class=\"wrap\">" in html
-
-        html = update_head(html, name, slug, area)
-        html = cleanup_body(html, name, area, has_article)
-
-        p.write_text(html, encoding="utf-8")
+    # Imported here: rewrite_pages imports every step module, this one included.
+    from rewrite_pages import main as rewrite_main
+
+    rewrite_main(default_steps=("naver_cleanup",))
 
 
 if __name__ == "__main__":
@@ -1,25 +1,45 @@
 #!/usr/bin/env python3
 import argparse
+import codecs
+import functools
+import http.client
 import json
 import sys
+import threading
 import time
+import urllib.error
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ThreadPoolExecutor
 from html.parser import HTMLParser
 
+from http_validators import ValidatorCache, default_validator_path
+
 NAVER_UA = (
     "Mozilla/5.0 (compatible; Yeti/1.1; +https://help.naver.com/robots)"
 )
 
 DEFAULT_TIMEOUT = 15
+DEFAULT_CONCURRENCY = 8
+# OG tags sit in the first few KB of every page; read in small steps so the
+# transfer can stop soon after </head>.
+HEAD_CHUNK_SIZE = 4096
+MAX_REDIRECTS = 10
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
 
 class OGParser(HTMLParser):
     def __init__(self):
         super().__init__()
         self.og = {}
+        self.head_done = False
 
     def handle_starttag(self, tag, attrs):
+        if tag.lower() == "body":
+            # </head> is optional; the body starting closes it too.
+            self.head_done = True
+            return
         if tag.lower() != "meta":
             return
         attr = {k.lower(): v for k, v in attrs}
@@ -30,26 +50,217 @@ class OGParser(HTMLParser):
             content = attr.get("content", "")
             self.og[prop.lower()] = content
 
+    def handle_endtag(self, tag):
+        if tag.lower() == "head":
+            self.head_done = True
+
+
+class TransferStats:
+    """Bytes read versus skipped by head-only page parsing, across threads."""
+
+    def __init__(self):
+        self.read = 0
+        self.saved = 0
+        self.stopped = 0
+        self._lock = threading.Lock()
+
+    def add(self, headers, read):
+        length = headers.get("Content-Length")
+        with self._lock:
+            self.read += read
+            if length and length.isdigit() and int(length) > read:
+                self.saved += int(length) - read
+                self.stopped += 1
+
+
+def read_og(resp, stats=None):
+    """Feed ``resp`` to an ``OGParser`` in chunks, stopping at ``</head>``.
+
+    Returns the OG tags; bytes read and skipped are added to ``stats``.
+    """
+    parser = OGParser()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    read = 0
+    while not parser.head_done:
+        chunk = resp.read(HEAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+    if stats is not None:
+        stats.add(resp.headers, read)
+    return parser.og
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections shared by worker threads, per host."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_idle=DEFAULT_CONCURRENCY, rebase=None):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.rebase = rebase
+        self.proxies = urllib.request.getproxies()
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, key):
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop(), True
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout), False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _proxied(self, url):
+        parsed = urllib.parse.urlsplit(url)
+        return parsed.scheme in self.proxies and not urllib.request.proxy_bypass(parsed.hostname or "")
+
+    def _send(self, url, headers, consume=None):
+        parsed = urllib.parse.urlsplit(url)
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        path = urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+        while True:
+            conn, reused = self._checkout(key)
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                if consume is not None and 200 <= resp.status < 300:
+                    body = consume(resp)
+                else:
+                    body = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused:
+                    # The server dropped an idle keep-alive connection; retry
+                    # on a fresh one.
+                    continue
+                raise
+            if resp.will_close or not resp.isclosed():
+                # Unread body left behind by consume(); the connection cannot
+                # be reused.
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return resp, body
+
+    def request(self, url, headers, consume=None):
+        """GET ``url`` following redirects; mirrors ``urllib.request.urlopen``.
+
+        ``consume(resp)`` reads a 2xx body in place of ``resp.read()``.
+        """
+        if self.rebase:
+            url = self.rebase(url)
+        for _ in range(MAX_REDIRECTS + 1):
+            if self._proxied(url):
+                # http.client ignores HTTP(S)_PROXY; let urllib go through the
+                # proxy, as it does without the pool.
+                return urlopen(url, headers, consume)
+            resp, body = self._send(url, headers, consume)
+            location = resp.getheader("Location")
+            if resp.status in REDIRECT_CODES and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            if not 200 <= resp.status < 300:
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            return resp.status, body, resp.headers
+        raise urllib.error.HTTPError(url, resp.status, "too many redirects", resp.headers, None)
 
-def fetch(url, user_agent, cache_bust=False):
-    target = url
-    if cache_bust:
-        parsed = urllib.parse.urlparse(url)
-        q = urllib.parse.parse_qs(parsed.query)
-        q["__ogcheck"] = [str(int(time.time()))]
-        new_query = urllib.parse.urlencode(q, doseq=True)
-        target = parsed._replace(query=new_query).geturl()
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
 
-    req = urllib.request.Request(target)
-    req.add_header("User-Agent", user_agent)
-    req.add_header("Cache-Control", "no-cache")
-    req.add_header("Pragma", "no-cache")
+
+class OnceCache:
+    """Run a computation once per key, even when many threads ask at once."""
+
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, fn):
+        with self._lock:
+            fut = self._futures.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._futures[key] = Future()
+        if owner:
+            try:
+                fut.set_result(fn())
+            except Exception as exc:
+                fut.set_exception(exc)
+        return fut.result()
+
+
+def cache_bust_url(url):
+    parsed = urllib.parse.urlparse(url)
+    q = urllib.parse.parse_qs(parsed.query)
+    q["__ogcheck"] = [str(int(time.time()))]
+    new_query = urllib.parse.urlencode(q, doseq=True)
+    return parsed._replace(query=new_query).geturl()
+
+
+def urlopen(url, headers, consume=None):
+    req = urllib.request.Request(url, headers=headers)
     with urllib.request.urlopen(req, timeout=DEFAULT_TIMEOUT) as resp:
-        return resp.getcode(), resp.read(), resp.headers
+        body = consume(resp) if consume is not None else resp.read()
+        return resp.getcode(), body, resp.headers
+
 
+def fetch(url, user_agent, cache_bust=False, pool=None, consume=None, validators=None):
+    target = cache_bust_url(url) if cache_bust else url
+
+    headers = {
+        "User-Agent": user_agent,
+        "Cache-Control": "no-cache",
+        "Pragma": "no-cache",
+    }
+    if validators is not None:
+        headers.update(validators.conditional_headers(url, data=consume is not None))
+    try:
+        if pool is not None:
+            status, body, resp_headers = pool.request(target, headers, consume)
+        else:
+            status, body, resp_headers = urlopen(target, headers, consume)
+    except urllib.error.HTTPError as exc:
+        if exc.code != 304 or validators is None:
+            raise
+        # Unchanged since the last run: answer from the stored validators.
+        cached = validators.revalidated(url, data=consume is not None)
+        if cached is not None:
+            return cached
+        return fetch(url, user_agent, cache_bust, pool, consume)
+    if validators is not None:
+        if consume is not None:
+            validators.store(url, status, resp_headers, data=body)
+        else:
+            validators.store(url, status, resp_headers, body)
+    return status, body, resp_headers
 
-def parse_sitemap(sitemap_url, user_agent):
-    code, body, _ = fetch(sitemap_url, user_agent, cache_bust=True)
+
+def rebase_origin(site_url):
+    """Return a function that points absolute URLs at ``site_url``'s origin."""
+    base = urllib.parse.urlsplit(site_url)
+
+    def rebase(url):
+        return urllib.parse.urlsplit(url)._replace(scheme=base.scheme, netloc=base.netloc).geturl()
+
+    return rebase
+
+
+def parse_sitemap(sitemap_url, user_agent, pool=None):
+    code, body, _ = fetch(sitemap_url, user_agent, cache_bust=True, pool=pool)
     if code != 200:
         raise RuntimeError(f"sitemap fetch failed: {sitemap_url} (status {code})")
     root = ET.fromstring(body)
@@ -63,7 +274,12 @@ def parse_sitemap(sitemap_url, user_agent):
     return urls
 
 
-def check_url(url, user_agent):
+def check_image(image_url, user_agent, pool=None, validators=None):
+    img_status, _, img_headers = fetch(image_url, user_agent, cache_bust=True, pool=pool, validators=validators)
+    return img_status, img_headers.get("Content-Type")
+
+
+def check_url(url, user_agent, pool=None, images=None, stats=None, validators=None):
     result = {
         "url": url,
         "status": None,
@@ -75,33 +291,37 @@ def check_url(url, user_agent):
         "cache_bust_og": {},
     }
 
-    status, body, _ = fetch(url, user_agent, cache_bust=False)
+    consume = functools.partial(read_og, stats=stats)
+    status, og, _ = fetch(url, user_agent, cache_bust=False, pool=pool, consume=consume, validators=validators)
     result["status"] = status
     if status != 200:
         return result
 
-    parser = OGParser()
-    parser.feed(body.decode("utf-8", errors="ignore"))
-    result["og"] = parser.og
+    result["og"] = og
 
     for key in ("og:title", "og:description", "og:image"):
-        if not parser.og.get(key):
+        if not og.get(key):
             result["missing"].append(key)
 
-    # Cache-bust fetch to detect stale edge cache behavior
-    bust_status, bust_body, _ = fetch(url, user_agent, cache_bust=True)
+    # Cache-bust fetch to detect stale edge cache behavior; without
+    # validators, which belong to the un-busted URL.
+    bust_status, bust_og, _ = fetch(url, user_agent, cache_bust=True, pool=pool, consume=consume)
     result["cache_bust_status"] = bust_status
     if bust_status == 200:
-        bust_parser = OGParser()
-        bust_parser.feed(bust_body.decode("utf-8", errors="ignore"))
-        result["cache_bust_og"] = bust_parser.og
+        result["cache_bust_og"] = bust_og
 
-    image_url = parser.og.get("og:image")
+    image_url = og.get("og:image")
     if image_url:
         try:
-            img_status, _, img_headers = fetch(image_url, user_agent, cache_bust=True)
+            if images is None:
+                img_status, content_type = check_image(image_url, user_agent, pool, validators)
+            else:
+                # Pages often share one og:image; fetch each distinct URL once.
+                img_status, content_type = images.get(
+                    image_url, lambda: check_image(image_url, user_agent, pool, validators)
+                )
             result["image_status"] = img_status
-            result["image_content_type"] = img_headers.get("Content-Type")
+            result["image_content_type"] = content_type
         except Exception as exc:
             result["image_status"] = f"error: {exc}"
 
@@ -115,17 +335,41 @@ def main():
     parser.add_argument("--log-dir", default=".og-check")
     parser.add_argument("--retries", type=int, default=20)
     parser.add_argument("--retry-wait", type=int, default=15)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="parallel page checks over pooled keep-alive connections (1 = sequential urllib)",
+    )
+    parser.add_argument(
+        "--rebase",
+        action="store_true",
+        help="fetch sitemap/og:image URLs from --site-url's origin (e.g. a local http.server over _legacy)",
+    )
+    parser.add_argument("--validator-cache", default=default_validator_path("og_check"))
+    parser.add_argument(
+        "--no-validators",
+        action="store_true",
+        help="always download full bodies instead of sending If-None-Match/If-Modified-Since",
+    )
     args = parser.parse_args()
 
     site_url = args.site_url.rstrip("/")
     sitemap_url = args.sitemap_url or f"{site_url}/sitemap.xml"
 
+    pool = None
+    if args.concurrency > 1 or args.rebase:
+        pool = ConnectionPool(
+            max_idle=max(args.concurrency, 1),
+            rebase=rebase_origin(site_url) if args.rebase else None,
+        )
+
     # Retry loop to wait for deployment propagation
     urls = []
     last_err = None
     for _ in range(args.retries):
         try:
-            urls = parse_sitemap(sitemap_url, NAVER_UA)
+            urls = parse_sitemap(sitemap_url, NAVER_UA, pool=pool)
             if urls:
                 break
         except Exception as exc:
@@ -143,12 +387,18 @@ def main():
     json_path = os.path.join(args.log_dir, "og-check.jsonl")
     summary_path = os.path.join(args.log_dir, "og-check.log")
 
+    images = OnceCache()
+    stats = TransferStats()
+    validators = None if args.no_validators else ValidatorCache(args.validator_cache, "og_check")
+    start = time.perf_counter()
     failures = 0
-    with open(json_path, "w", encoding="utf-8") as jf, open(summary_path, "w", encoding="utf-8") as sf:
+    with ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as executor, open(
+        json_path, "w", encoding="utf-8"
+    ) as jf, open(summary_path, "w", encoding="utf-8") as sf:
         header = "url,status,missing,og:title,og:description,og:image,image_status,image_content_type,cache_bust_status\n"
         sf.write(header)
-        for url in urls:
-            result = check_url(url, NAVER_UA)
+        # map() yields in sitemap order, so the logs match a sequential run.
+        for result in executor.map(lambda url: check_url(url, NAVER_UA, pool, images, stats, validators), urls):
             jf.write(json.dumps(result, ensure_ascii=False) + "\n")
 
             missing = "|".join(result["missing"]) if result["missing"] else ""
@@ -168,7 +418,18 @@ def main():
             if result["status"] != 200 or result["missing"] or result["image_status"] != 200:
                 failures += 1
 
-    print(f"Checked {len(urls)} URLs. Failures: {failures}")
+    if pool is not None:
+        pool.close()
+    if validators is not None:
+        validators.save()
+
+    print(f"Checked {len(urls)} URLs in {time.perf_counter() - start:.1f}s. Failures: {failures}")
+    print(
+        f"Page bytes read: {stats.read}, saved by stopping at </head>: {stats.saved} "
+        f"({stats.stopped} transfers cut short)"
+    )
+    if validators is not None:
+        print(f"Unchanged (304): {validators.revalidated_count}, bytes not re-downloaded: {validators.bytes_saved}")
     print(f"Log: {summary_path}")
     print("Note: Naver share caches OG by URL. This check uses Naver UA and cache-busting query for freshness diagnostics.")
 
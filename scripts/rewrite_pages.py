@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import add_age_gate_overlay
+import add_page_theme_script
+import add_ui_css
+import html_rewrite
+import naver_cleanup
+import seo_content_update
+import unify_design
+from html_rewrite import Rewriter, atomic_write, unified_diff
+
+# Step name -> (module, rules, target files, page context). Steps run in this
+# order and are merged into one rewriter, so each page is read, scanned and
+# written once however many steps apply to it.
+STEPS = {
+    "naver_cleanup": (
+        naver_cleanup,
+        naver_cleanup.RULES,
+        naver_cleanup.PAGES,
+        lambda path, html: naver_cleanup.page_context(path, naver_cleanup.PAGES[path], html),
+    ),
+    "seo_content": (
+        seo_content_update,
+        seo_content_update.RULES,
+        seo_content_update.PAGES,
+        lambda path, html: seo_content_update.PAGES[path],
+    ),
+    "unify_design": (unify_design, unify_design.RULES, unify_design.HTML_FILES, None),
+    "ui_css": (add_ui_css, add_ui_css.RULES, add_ui_css.HTML_FILES, None),
+    "age_gate": (add_age_gate_overlay, add_age_gate_overlay.RULES, add_age_gate_overlay.HTML_FILES, None),
+    "page_theme": (add_page_theme_script, add_page_theme_script.RULES, add_page_theme_script.HTML_FILES, None),
+}
+
+# Steps that rewrite page content need per-page metadata, so a sitemap or
+# glob run only applies them to the pages listed in their PAGES dict.
+CONTENT_STEPS = ("naver_cleanup", "seo_content")
+DEFAULT_STEPS = ("unify_design", "ui_css", "age_gate", "page_theme")
+# Older runs kept their state inside --root, where it got published.
+STATE_VERSION = 1
+
+_rewriters = {}
+
+
+def build(steps):
+    rewriter = Rewriter([])
+    for name in STEPS:
+        if name in steps:
+            rewriter += STEPS[name][1].scoped(name)
+    return rewriter
+
+
+def rules_key(steps):
+    # Output hashes are only trusted while the rules that produced them are
+    # unchanged, so the key covers the step list and the rule sources.
+    h = hashlib.sha256(",".join(steps).encode())
+    for module in [html_rewrite] + [STEPS[name][0] for name in steps]:
+        h.update(Path(module.__file__).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def sitemap_files(root, sitemap):
+    tree = ET.parse(sitemap)
+    ns = ""
+    if tree.getroot().tag.startswith("{"):
+        ns = tree.getroot().tag.split("}", 1)[0] + "}"
+    files = []
+    for loc in tree.getroot().findall(f".//{ns}loc"):
+        if not loc.text:
+            continue
+        path = urllib.parse.urlsplit(loc.text.strip()).path.lstrip("/")
+        if not path or path.endswith("/"):
+            path += "index.html"
+        elif not path.endswith(".html"):
+            path += "/index.html"
+        if (root / path).is_file():
+            files.append(path)
+        else:
+            print(f"[skip] {loc.text.strip()} has no file under {root}", file=sys.stderr)
+    return files
+
+
+def plan(root, steps, sitemap=None, globs=()):
+    """Map each target file (relative to ``root``) to the steps it gets."""
+    if not sitemap and not globs:
+        targets = {}
+        for name in steps:
+            for path in STEPS[name][2]:
+                targets.setdefault(path, []).append(name)
+        return targets
+
+    files = sitemap_files(root, sitemap) if sitemap else []
+    for pattern in globs:
+        files.extend(p.relative_to(root).as_posix() for p in sorted(root.glob(pattern)) if p.is_file())
+    targets = {}
+    for path in dict.fromkeys(files):
+        page_steps = [name for name in steps if name not in CONTENT_STEPS or path in STEPS[name][2]]
+        if page_steps:
+            targets[path] = page_steps
+    return targets
+
+
+def rewrite_file(task):
+    """Worker: rewrite one page; return (path, status, output hash, diff)."""
+    root, path, page_steps, known, dry_run = task
+    p = Path(root) / path
+    try:
+        data = p.read_bytes()
+    except FileNotFoundError:
+        return path, "missing", None, None
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known:
+        return path, "skipped", digest, None
+
+    key = tuple(page_steps)
+    rewriter = _rewriters.get(key)
+    if rewriter is None:
+        rewriter = _rewriters[key] = build(page_steps)
+    before = data.decode("utf-8")
+    page = {}
+    for name in page_steps:
+        context = STEPS[name][3]
+        page[name] = context(path, before) if context else True
+    after = rewriter.apply(before, page)
+    if after == before:
+        return path, "unchanged", digest, None
+    if dry_run:
+        return path, "changed", None, unified_diff(path, before, after)
+    atomic_write(p, after)
+    return path, "changed", hashlib.sha256(after.encode("utf-8")).hexdigest(), None
+
+
+def default_state_path(root):
+    # Outside the tree being rewritten, so it never ships with the site; one
+    # file per root, since the hashes are of that root's pages.
+    cache = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    digest = hashlib.sha256(str(root.resolve()).encode()).hexdigest()[:16]
+    return cache / "rewrite-pages" / f"{digest}.json"
+
+
+def load_state(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION:
+        return {}
+    return state.get("runs", {})
+
+
+def save_state(path, runs):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": STATE_VERSION, "runs": runs}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def main(default_steps=DEFAULT_STEPS):
+    parser = argparse.ArgumentParser(description="Apply the page mutation steps in one pass per file")
+    parser.add_argument("--root", default=".", help="directory the step file lists are relative to")
+    parser.add_argument("--steps", default=",".join(default_steps), help=f"comma list of: {', '.join(STEPS)}")
+    parser.add_argument("--sitemap", help="take targets from this sitemap.xml (locs map to files under --root)")
+    parser.add_argument("--glob", action="append", default=[], help="take targets from a glob under --root, e.g. '**/*.html'")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--state", default=None, help="hash state file (default: per root, under $XDG_CACHE_HOME/rewrite-pages)")
+    parser.add_argument("--force", action="store_true", help="rewrite pages even if their hash is unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="print a unified diff instead of writing")
+    args = parser.parse_args()
+
+    steps = [s for s in args.steps.split(",") if s]
+    for name in steps:
+        if name not in STEPS:
+            parser.error(f"unknown step: {name}")
+    if "naver_cleanup" in steps and "seo_content" in steps:
+        parser.error("naver_cleanup and seo_content both replace the page body; pick one")
+
+    root = Path(args.root)
+    targets = plan(root, steps, args.sitemap, args.glob)
+    state_path = Path(args.state) if args.state else default_state_path(root)
+    # One hash table per step set, so the single-step scripts and combined
+    # runs over the same tree do not invalidate each other.
+    runs = load_state(state_path)
+    key = rules_key(steps)
+    state = {} if args.force else runs.get(key, {})
+
+    tasks = [(str(root), path, page_steps, state.get(path), args.dry_run) for path, page_steps in targets.items()]
+    counts = {"changed": 0, "unchanged": 0, "skipped": 0, "missing": 0}
+    start = time.perf_counter()
+    if args.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(rewrite_file, tasks, chunksize=max(1, len(tasks) // (args.jobs * 4))))
+    else:
+        results = [rewrite_file(task) for task in tasks]
+    elapsed = time.perf_counter() - start
+
+    for path, status, digest, diff in results:
+        counts[status] += 1
+        if status == "missing":
+            print(f"[skip] {root / path} not found", file=sys.stderr)
+        if diff:
+            sys.stdout.write(diff)
+        if digest and not args.dry_run:
+            state[path] = digest
+    if not args.dry_run:
+        runs[key] = state
+        save_state(state_path, runs)
+
+    pages = len(tasks) - counts["missing"]
+    verb = "would change" if args.dry_run else "changed"
+    print(
+        f"{counts['changed']} files {verb}, {counts['unchanged']} unchanged, "
+        f"{counts['skipped']} skipped by hash in {elapsed:.3f}s "
+        f"({pages / elapsed if elapsed else 0:.0f} pages/s, {args.jobs} jobs)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
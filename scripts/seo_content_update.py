@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-from pathlib import Path
 import re
 
+from html_rewrite import Insert, Rewriter, Rule
+
 DATE = "2026-02-03"
 DATE_TIME = "2026-02-03T00:00:00+09:00"
 SITE = "https://informationa.pages.dev"
@@ -289,24 +290,7 @@ PAGES = {
 }
 
 
-def update_head(html, page):
-    html = re.sub(r"<title>.*?</title>", f"<title>{page['title']}</title>", html, flags=re.IGNORECASE)
-    html = re.sub(r"<meta name=\"description\" content=\".*?\">", f"<meta name=\"description\" content=\"{page['desc']}\">", html, flags=re.IGNORECASE)
-    html = re.sub(r"<meta name=\"date\" content=\".*?\">", f"<meta name=\"date\" content=\"{DATE}\">", html, flags=re.IGNORECASE)
-    html = re.sub(r"<meta name=\"last-modified\" content=\".*?\">", f"<meta name=\"last-modified\" content=\"{DATE}\">", html, flags=re.IGNORECASE)
-
-    html = re.sub(r"<meta property=\"article:published_time\" content=\".*?\">", f"<meta property=\"article:published_time\" content=\"{DATE_TIME}\">", html, flags=re.IGNORECASE)
-    html = re.sub(r"<meta property=\"article:modified_time\" content=\".*?\">", f"<meta property=\"article:modified_time\" content=\"{DATE_TIME}\">", html, flags=re.IGNORECASE)
-
-    html = re.sub(r"<meta property=\"og:title\" content=\".*?\">", f"<meta property=\"og:title\" content=\"{page['title']}\">", html, flags=re.IGNORECASE)
-    html = re.sub(r"<meta property=\"og:description\" content=\".*?\">", f"<meta property=\"og:description\" content=\"{page['desc']}\">", html, flags=re.IGNORECASE)
-
-    html = re.sub(r"<meta name=\"twitter:title\" content=\".*?\">", f"<meta name=\"twitter:title\" content=\"{page['title']}\">", html, flags=re.IGNORECASE)
-    html = re.sub(r"<meta name=\"twitter:description\" content=\".*?\">", f"<meta name=\"twitter:description\" content=\"{page['desc']}\">", html, flags=re.IGNORECASE)
-
-    # Remove existing JSON-LD
-    html = re.sub(r"<script type=\"application/ld\+json\">.*?</script>", "", html, flags=re.DOTALL)
-
+def build_jsonld(page):
     url = f"{SITE}/{page['slug']}/"
     keywords = page["keywords"]
     jsonld = f"""
@@ -349,32 +333,61 @@ def update_head(html, page):
 }}
 </script>
 """
+    return jsonld
 
-    html = re.sub(r"</head>", jsonld + "</head>", html, flags=re.IGNORECASE)
-    return html
 
+def fill(template):
+    return lambda match, page: template.format(page=page, date=DATE, date_time=DATE_TIME)
 
-def replace_body(html, page):
-    # Remove broken overlay chunk if present
-    html = re.sub(r"<!-- 성인 확인 오버레이 -->[\s\S]*?<div style=\"background:#", "<div style=\"background:#", html)
 
-    body = page["body"].strip()
+def has_article(html, page):
+    return "<article class=\"wrap\">" in html
+
+
+def has_content_only(html, page):
+    return "<article class=\"wrap\">" not in html and "<div class=\"content\">" in html
+
 
-    if "<article class=\"wrap\">" in html:
-        html = re.sub(r"<article class=\"wrap\">[\s\S]*?</article>", f"<article class=\"wrap\">\n{body}\n</article>", html)
-    elif "<div class=\"content\">" in html:
-        html = re.sub(r"<div class=\"content\">[\s\S]*?</div>", f"<div class=\"content\">\n{body}\n</div>", html)
+def body_block(open_tag, close_tag):
+    return lambda match, page: f"{open_tag}\n{page['body'].strip()}\n{close_tag}"
 
-    return html
+
+HEAD_RULES = [
+    Rule(r"<title>.*?</title>", fill("<title>{page[title]}</title>"), re.IGNORECASE),
+    Rule(r"<meta name=\"description\" content=\".*?\">", fill("<meta name=\"description\" content=\"{page[desc]}\">"), re.IGNORECASE),
+    Rule(r"<meta name=\"date\" content=\".*?\">", fill("<meta name=\"date\" content=\"{date}\">"), re.IGNORECASE),
+    Rule(r"<meta name=\"last-modified\" content=\".*?\">", fill("<meta name=\"last-modified\" content=\"{date}\">"), re.IGNORECASE),
+
+    Rule(r"<meta property=\"article:published_time\" content=\".*?\">", fill("<meta property=\"article:published_time\" content=\"{date_time}\">"), re.IGNORECASE),
+    Rule(r"<meta property=\"article:modified_time\" content=\".*?\">", fill("<meta property=\"article:modified_time\" content=\"{date_time}\">"), re.IGNORECASE),
+
+    Rule(r"<meta property=\"og:title\" content=\".*?\">", fill("<meta property=\"og:title\" content=\"{page[title]}\">"), re.IGNORECASE),
+    Rule(r"<meta property=\"og:description\" content=\".*?\">", fill("<meta property=\"og:description\" content=\"{page[desc]}\">"), re.IGNORECASE),
+
+    Rule(r"<meta name=\"twitter:title\" content=\".*?\">", fill("<meta name=\"twitter:title\" content=\"{page[title]}\">"), re.IGNORECASE),
+    Rule(r"<meta name=\"twitter:description\" content=\".*?\">", fill("<meta name=\"twitter:description\" content=\"{page[desc]}\">"), re.IGNORECASE),
+
+    # Remove existing JSON-LD
+    Rule(r"<script type=\"application/ld\+json\">.*?</script>", "", re.DOTALL),
+    Insert("</head>", build_jsonld, re.IGNORECASE),
+]
+
+BODY_RULES = [
+    # Remove broken overlay chunk if present
+    Rule(r"<!-- 성인 확인 오버레이 -->[\s\S]*?(?=<div style=\"background:#)", ""),
+
+    Rule(r"<article class=\"wrap\">[\s\S]*?</article>", body_block("<article class=\"wrap\">", "</article>"), when=has_article),
+    Rule(r"<div class=\"content\">[\s\S]*?</div>", body_block("<div class=\"content\">", "</div>"), when=has_content_only),
+]
+
+RULES = Rewriter(HEAD_RULES + BODY_RULES)
 
 
 def main():
-    for path, page in PAGES.items():
-        p = Path(path)
-        html = p.read_text(encoding="utf-8")
-        html = update_head(html, page)
-        html = replace_body(html, page)
-        p.write_text(html, encoding="utf-8")
+    # Imported here: rewrite_pages imports every step module, this one included.
+    from rewrite_pages import main as rewrite_main
+
+    rewrite_main(default_steps=("seo_content",))
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-from pathlib import Path
 import re
 
+from html_rewrite import Rewriter, Rule
+
 HTML_FILES = [
     "index.html",
     "404.html",
@@ -16,24 +17,22 @@ HTML_FILES = [
     "og/preview-1x1.html",
 ]
 
-STYLE_BLOCK_RE = re.compile(r"<style(?![^>]*age-gate-style)[^>]*>[\s\S]*?</style>", re.IGNORECASE)
-STYLE_ATTR_RE = re.compile(r"\sstyle=\"[^\"]*\"")
-STYLE_ATTR_RE_SQ = re.compile(r"\sstyle='[^']*'")
+RULES = Rewriter([
+    Rule(r"<style(?![^>]*age-gate-style)[^>]*>[\s\S]*?</style>", "", re.IGNORECASE),
+    Rule(r"\sstyle=\"[^\"]*\"", ""),
+    Rule(r"\sstyle='[^']*'", ""),
+])
 
 
 def clean_html(text: str) -> str:
-    text = STYLE_BLOCK_RE.sub("", text)
-    text = STYLE_ATTR_RE.sub("", text)
-    text = STYLE_ATTR_RE_SQ.sub("", text)
-    return text
+    return RULES.apply(text)
 
 
 def main():
-    for path in HTML_FILES:
-        p = Path(path)
-        text = p.read_text(encoding="utf-8")
-        text = clean_html(text)
-        p.write_text(text, encoding="utf-8")
+    # Imported here: rewrite_pages imports every step module, this one included.
+    from rewrite_pages import main as rewrite_main
+
+    rewrite_main(default_steps=("unify_design",))
 
 
 if __name__ == "__main__":